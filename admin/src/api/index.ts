@@ -6,6 +6,7 @@ import type {
   StatsResult,
   CalculateLogItem,
   Announcement,
+  PagedResult,
 } from '@/types/admin';
 
 export const login = async (
@@ -20,8 +21,16 @@ export const logout = async (): Promise<void> => {
   localStorage.removeItem('admin_user');
 };
 
-export const fetchUsers = async (params: { page?: number; per_page?: number; search?: string }) => {
-  const { data } = await adminApiClient.get<{ items: UserListItem[]; total: number }>(
+/** 列表分页参数：传 cursor 时按 keyset 翻页（与页码无关的常数耗时），否则按 page 走 OFFSET */
+export interface PageParams {
+  page?: number;
+  per_page?: number;
+  cursor?: string;
+  total?: 'exact' | 'approx' | 'none';
+}
+
+export const fetchUsers = async (params: PageParams & { search?: string }) => {
+  const { data } = await adminApiClient.get<PagedResult<UserListItem>>(
     '/api/admin/users',
     { params }
   );
@@ -33,8 +42,8 @@ export const fetchStats = async () => {
   return data;
 };
 
-export const fetchCalculateLogs = async (params: { page?: number; per_page?: number }) => {
-  const { data } = await adminApiClient.get<{ items: CalculateLogItem[]; total: number }>(
+export const fetchCalculateLogs = async (params: PageParams) => {
+  const { data } = await adminApiClient.get<PagedResult<CalculateLogItem>>(
     '/api/admin/calculate-logs',
     { params }
   );
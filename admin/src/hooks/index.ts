@@ -4,5 +4,5 @@ export {
   ADMIN_SWR_KEYS,
   mutate,
 } from './useAdminSWR';
-export { useAdminMutation } from './useAdminSWR';
+export { useAdminMutation, useCursorPages } from './useAdminSWR';
 export { default } from './useAdminSWR';
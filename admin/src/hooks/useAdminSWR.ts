@@ -1,4 +1,4 @@
-import { useEffect, useState, useCallback } from 'react';
+import { useEffect, useState, useCallback, useRef } from 'react';
 import useSWR, { mutate, type SWRConfiguration, type KeyedMutator } from 'swr';
 import { message } from 'antd';
 import adminApiClient from '@/api/client';
@@ -86,5 +86,27 @@ export function useAdminMutation<TArgs = void, TResult = unknown>(
   return { trigger, loading };
 }
 
+/**
+ * 列表 keyset 翻页：记录每页对应的游标（第 page 页由第 page-1 页返回的 next_cursor 获得）。
+ * 顺序翻页时用游标请求，跳页或游标未知时返回 undefined，由调用方回退到 page（OFFSET）请求。
+ */
+export function useCursorPages(resetKey?: unknown) {
+  const cursors = useRef(new Map<number, string>());
+
+  useEffect(() => {
+    cursors.current.clear();
+  }, [resetKey]);
+
+  const cursorFor = useCallback((page: number) => cursors.current.get(page), []);
+
+  const remember = useCallback((page: number, nextCursor?: string | null) => {
+    if (nextCursor) {
+      cursors.current.set(page + 1, nextCursor);
+    }
+  }, []);
+
+  return { cursorFor, remember };
+}
+
 export { mutate };
 export default useAdminSWR;
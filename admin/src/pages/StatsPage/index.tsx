@@ -1,7 +1,7 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { Card, Row, Col, Statistic, Table } from 'antd';
 import { UserOutlined, CalculatorOutlined, FireOutlined } from '@ant-design/icons';
-import useAdminSWR, { ADMIN_SWR_KEYS } from '@/hooks';
+import useAdminSWR, { ADMIN_SWR_KEYS, useCursorPages } from '@/hooks';
 import { fetchStats, fetchCalculateLogs } from '@/api';
 
 export default function StatsPage() {
@@ -13,12 +13,21 @@ export default function StatsPage() {
     { errorMessage: '加载统计失败' }
   );
 
+  const { cursorFor, remember } = useCursorPages();
+
   const { data: logsData, isLoading: logsLoading } = useAdminSWR(
     ADMIN_SWR_KEYS.calculateLogs(page),
-    () => fetchCalculateLogs({ page, per_page: 20 }),
+    () => {
+      const cursor = cursorFor(page);
+      return fetchCalculateLogs(cursor ? { cursor, per_page: 20 } : { page, per_page: 20 });
+    },
     { errorMessage: '加载计算记录失败' }
   );
 
+  useEffect(() => {
+    remember(page, logsData?.next_cursor);
+  }, [logsData, page, remember]);
+
   const columns = [
     { title: 'ID', dataIndex: 'id', key: 'id', width: 70 },
     { title: '用户ID', dataIndex: 'user_id', key: 'user_id', width: 80, render: (v: number | null) => v ?? '—' },
@@ -1,18 +1,31 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { Card, Table, Input, Space } from 'antd';
 import { SearchOutlined } from '@ant-design/icons';
-import useAdminSWR, { ADMIN_SWR_KEYS } from '@/hooks';
+import useAdminSWR, { ADMIN_SWR_KEYS, useCursorPages } from '@/hooks';
 import { fetchUsers } from '@/api';
 export default function UserManagement() {
   const [page, setPage] = useState(1);
   const [search, setSearch] = useState('');
 
+  const { cursorFor, remember } = useCursorPages(search);
+
   const { data, isLoading } = useAdminSWR(
     ADMIN_SWR_KEYS.users(page, search),
-    () => fetchUsers({ page, per_page: 20, search: search || undefined }),
+    () => {
+      const cursor = cursorFor(page);
+      return fetchUsers(
+        cursor
+          ? { cursor, per_page: 20, search: search || undefined }
+          : { page, per_page: 20, search: search || undefined }
+      );
+    },
     { errorMessage: '加载用户列表失败' }
   );
 
+  useEffect(() => {
+    remember(page, data?.next_cursor);
+  }, [data, page, remember]);
+
   const onSearch = () => {
     setPage(1);
   };
@@ -67,6 +67,13 @@ export interface UserListItem {
   created_at: string;
 }
 
+/** 管理端分页列表：next_cursor 为下一页的 keyset 游标（无下一页时为 null） */
+export interface PagedResult<T> {
+  items: T[];
+  total: number | null;
+  next_cursor?: string | null;
+}
+
 export interface StatsResult {
   total_users: number;
   today_calculates: number;
@@ -0,0 +1,116 @@
+"""
+C 端公告的时间窗感知缓存。
+一次读出全部 active = 1 的公告（含 start_at / end_at），在内存中按“当前时刻”筛出生效公告并按 locale 生成 CachedBody；
+所有公告的开始/结束时刻排成边界点，当前时间窗在下一个边界点到期，到期后用内存中的行重新筛选，无需查库。
+“当前时刻”取数据库时钟（NOW() / datetime('now')），加载时记下与本机时钟的差值，与原 SQL 中的比较保持同一时区。
+管理端增删改公告时 bump 版本号，各 worker 通过 VersionedCache 轮询版本后重新加载。
+"""
+import threading
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from config import IS_PRODUCTION
+from db import get_connection, cursor
+from http_cache import CachedBody
+
+ANNOUNCEMENT_CACHE = "announcements"
+
+# 数据库时间精度为秒：end_at 当秒仍生效（end_at >= NOW()），下一秒起失效
+_RESOLUTION = timedelta(seconds=1)
+
+
+def _parse_time(value) -> Optional[datetime]:
+    """DATETIME / 文本 -> 无时区 datetime；带时区的文本换算为 UTC（与 SQLite datetime('now') 一致）。"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).strip())
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class AnnouncementSchedule:
+    """某一版本的公告数据：按数据库时钟计算当前时间窗内各 locale 的响应体。"""
+
+    def __init__(self, rows: List[dict], db_now: datetime, render: Callable[[list], bytes]):
+        self._render = render
+        self._rows = []
+        boundaries = set()
+        for r in rows:
+            try:
+                start, end = _parse_time(r.get("start_at")), _parse_time(r.get("end_at"))
+            except ValueError:
+                # 无法解析的时间无法判断是否生效，不展示
+                continue
+            self._rows.append((start, end, r))
+            if start is not None:
+                boundaries.add(start)
+            if end is not None:
+                boundaries.add(end + _RESOLUTION)
+        self._boundaries = sorted(boundaries)
+        self._offset = _parse_time(db_now) - datetime.now()
+        self._window: Optional[tuple] = None
+        # locale -> (生成时所在的时间窗, CachedBody)
+        self._bodies: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.windows = 0
+
+    def now(self) -> datetime:
+        return (datetime.now() + self._offset).replace(microsecond=0)
+
+    def _window_for(self, now: datetime) -> tuple:
+        """包含 now 的 [上一个边界, 下一个边界)；None 表示无界。"""
+        i = bisect_right(self._boundaries, now)
+        start = self._boundaries[i - 1] if i > 0 else None
+        end = self._boundaries[i] if i < len(self._boundaries) else None
+        return start, end
+
+    def _in_window(self, now: datetime) -> bool:
+        if self._window is None:
+            return False
+        start, end = self._window
+        return (start is None or start <= now) and (end is None or now < end)
+
+    def _active(self, locale: str, now: datetime) -> list:
+        return [
+            {"id": r["id"], "title": r["title"], "body": r["body"]}
+            for start, end, r in self._rows
+            if r["locale"] == locale and (start is None or start <= now) and (end is None or end >= now)
+        ]
+
+    def get(self, locale: str) -> tuple:
+        """返回 (CachedBody, 距当前时间窗结束的秒数或 None)。"""
+        now = self.now()
+        with self._lock:
+            if not self._in_window(now):
+                self._window = self._window_for(now)
+                self.windows += 1
+            window, cached = self._bodies.get(locale, (None, None))
+            if cached is None or window != self._window:
+                body = self._render(self._active(locale, now))
+                # 跨窗口后内容未变则复用原对象（ETag 与压缩结果不变）
+                if cached is None or cached.body != body:
+                    cached = CachedBody(body)
+                self._bodies[locale] = (self._window, cached)
+            end = self._window[1]
+        return cached, (None if end is None else max(0, int((end - now).total_seconds())))
+
+
+def load_schedule(render: Callable[[list], bytes]) -> AnnouncementSchedule:
+    """读取全部启用的公告与数据库当前时间（VersionedCache 的 loader）。"""
+    conn = get_connection()
+    try:
+        with cursor(conn) as cur:
+            cur.execute("SELECT NOW() AS now" if IS_PRODUCTION else "SELECT datetime('now') AS now")
+            db_now = cur.fetchone()["now"]
+            cur.execute(
+                "SELECT id, title, body, locale, start_at, end_at FROM announcements WHERE active = 1 ORDER BY id DESC"
+            )
+            rows = [dict(r) for r in cur.fetchall()]
+    finally:
+        conn.close()
+    return AnnouncementSchedule(rows, db_now, render)
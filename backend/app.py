@@ -1,24 +1,73 @@
 """
 Pet Eternal Flame - 宠物永恒之焰
-Flask API: 根据宠物死亡日期计算焚烧时间与数量（玄学规则），支持中英 locale 与翻译
+Flask API: 根据宠物死亡日期计算焚烧时间与数量（玄学规则），支持中英 locale（文案见 backend/locales 的 calculate 模板）
 """
+import hmac
+import json
+import threading
+from bisect import bisect_left
 from datetime import datetime, date
-from typing import List, Tuple
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
-from translate_zh_en import translate_zh_to_en, translate_zh_to_en_batch
-from db import get_connection, init_db, cursor
-from auth_utils import hash_password, verify_password, encode_token, decode_token
-from config import IS_PRODUCTION
+from translate_zh_en import translation_cache_stats
+from messages import render, join_sentences
+from db import get_connection, init_db, cursor, pool_stats
+from log_writer import calculate_log_writer
+from versioned_cache import VersionedCache, bump_version
+from http_cache import CachedBody
+from result_cache import DayScopedLRU
+import stat_counters
+import pagination
+import user_search
+import log_export
+import retention
+import site_settings
+import metrics
+import query_stats
+from announcement_cache import ANNOUNCEMENT_CACHE, load_schedule
+from auth_utils import (
+    PasswordHasherBusy,
+    hash_password,
+    verify_password,
+    needs_rehash,
+    encode_token,
+    decode_token,
+    token_cache_stats,
+)
+from config import (
+    IS_PRODUCTION,
+    CALCULATE_CACHE_SIZE,
+    CALCULATE_BATCH_MAX_ITEMS,
+    PUBLIC_CACHE_MAX_AGE,
+    METRICS_TOKEN,
+    QUERY_STATS_ENABLED,
+    SLOW_QUERY_MS,
+)
 
 try:
     import pymysql
 except ImportError:
     pymysql = None
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class _TimedJSONProvider(DefaultJSONProvider):
+    """jsonify 与 _json_dumps 的序列化耗时计入 serialize 阶段。"""
+
+    def dumps(self, obj, **kwargs):
+        with metrics.span("serialize"):
+            return super().dumps(obj, **kwargs)
+
+
 app = Flask(__name__)
+app.json = _TimedJSONProvider(app)
 CORS(
     app,
     origins=["*"],
@@ -27,6 +76,17 @@ CORS(
     supports_credentials=False,
 )
 
+@app.before_request
+def _start_request_timer():
+    metrics.request_started()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    metrics.request_finished(response.status_code)
+    return response
+
+
 # 吉日（每月推荐焚烧的日期，避开 4、9 等不吉日）
 LUCKY_DAY_OFFSETS = [1, 6, 8, 15, 18, 28]  # 含满月 15
 
@@ -46,12 +106,14 @@ ERRORS: dict = {
     "auth_invalid_credentials": {"zh": "用户名或密码错误", "en": "Invalid username or password."},
     "auth_unauthorized": {"zh": "请先登录", "en": "Please log in first."},
     "auth_db_unavailable": {"zh": "服务暂不可用，请稍后再试", "en": "Service temporarily unavailable. Please try again later."},
+    "auth_busy": {"zh": "登录请求过多，请稍后再试", "en": "Too many sign-in requests. Please try again shortly."},
+    "batch_invalid": {"zh": "请提交 JSON 数组或 NDJSON", "en": "Request body must be a JSON array or NDJSON."},
+    "batch_too_large": {"zh": "单次批量计算条目过多", "en": "Too many items in one batch."},
 }
 
-# 后端支持的 locale：用于归一化请求中的 locale，扩展时在此增加
+# 后端支持的 locale：用于归一化请求中的 locale，扩展时在此增加，
+# 并在 backend/locales/<locale>.json 补充 calculate 模板（可用 translate_zh_en.py 离线生成）
 SUPPORTED_LOCALES = ("zh", "en")
-# 需要从中文翻译的 locale（使用 deep-translator 等），其余返回中文
-TRANSLATABLE_LOCALES = ("en",)
 DEFAULT_LOCALE = "zh"
 
 
@@ -118,6 +180,11 @@ def _error_message(key: str, locale: str) -> str:
     return messages.get(locale) or messages.get("zh", "")
 
 
+def _json_dumps(obj) -> str:
+    """与 jsonify 相同的紧凑 JSON 序列化，用于预先生成响应体。"""
+    return app.json.dumps(obj, separators=(",", ":"))
+
+
 def _expand_language_rows(rows, field: str) -> dict:
     """将 language_strings 中的扁平 key（如 layout.title）展开为嵌套对象，方便 C 端直接作为 i18n 资源使用。"""
     root: dict = {}
@@ -138,21 +205,16 @@ def _expand_language_rows(rows, field: str) -> dict:
     return root
 
 
-def get_burning_dates(
-    death_date: date, today: date, count: int = 6
-) -> List[Tuple[str, str]]:
+def _scan_burning_dates(death_day: int, today: date, months: int) -> Iterator[Tuple[int, date]]:
     """
-    生成建议焚烧日期列表：从本月/下月起，每月取吉日，避开与死亡日「冲」的日期。
-    返回 [(日期, 说明), ...]
+    从本月起逐月扫描 months 个月的吉日，避开与死亡日「冲」的日期。
+    产出 (月序号, 日期)，月序号从 0（本月）开始。
     """
-    death_day = death_date.day
     # 冲日：与死亡日同「个位」的日期慎用，这里用「日数字相同」为冲，替换为相邻吉日
     avoid_days = {death_day, (death_day + 10) if death_day < 20 else death_day - 10}
 
-    result = []
-    # 从当前月开始，取接下来 count 个月的吉日
     year, month = today.year, today.month
-    for _ in range(count):
+    for idx in range(months):
         for d in LUCKY_DAY_OFFSETS:
             if d > 28:
                 continue
@@ -169,24 +231,97 @@ def get_burning_dates(
                     cand = date(year, month, alt)
                 except ValueError:
                     pass
-            result.append((cand.isoformat(), _format_date_desc(cand)))
-            if len(result) >= count:
-                return result
+            yield idx, cand
         # 下月
         month += 1
         if month > 12:
             month, year = 1, year + 1
 
-    return result[:count]
+
+class _BurningSpan:
+    """展开 months 个月后的吉日序列；各字段一起构建、整体替换，rendered 只缓存由本对象 dates 渲染的结果。"""
+
+    def __init__(self, today: date, months: int):
+        self.months = months
+        self.month_idx = {}  # death_day -> [月序号, ...]
+        self.dates = {}  # death_day -> [date, ...]
+        self.rendered = {}  # (death_day, locale) -> [(iso, 说明), ...]
+        for day in range(1, 32):
+            entries = list(_scan_burning_dates(day, today, months))
+            self.month_idx[day] = [i for i, _ in entries]
+            self.dates[day] = [d for _, d in entries]
+
+
+class _BurningCalendar:
+    """
+    某一天（today）的吉日索引：吉日只取决于 (today, 死亡日的「日」)，
+    对 1-31 日各预先展开 months 个月的吉日序列，查询时按 count 截取；count 超出已展开范围时整体加倍扩展。
+    扩展时换上新的 _BurningSpan（单次赋值），查询只读取同一个 span，不会把旧序列渲染进新缓存。
+    """
+
+    def __init__(self, today: date, months: int):
+        self.today = today
+        self._span = _BurningSpan(today, months)
+        self._lock = threading.Lock()
+
+    @property
+    def months(self) -> int:
+        return self._span.months
+
+    def lookup(self, death_day: int, count: int, locale: str) -> List[Tuple[str, str]]:
+        if count <= 0:
+            return []
+        span = self._span
+        if count > span.months:
+            with self._lock:
+                if count > self._span.months:
+                    self._span = _BurningSpan(self.today, max(count, self._span.months * 2))
+                span = self._span
+        key = (death_day, locale)
+        rendered = span.rendered.get(key)
+        if rendered is None:
+            rendered = [(d.isoformat(), _format_date_desc(d, locale)) for d in span.dates[death_day]]
+            span.rendered[key] = rendered
+        # 只取前 count 个月内的吉日，且最多 count 条
+        n = min(count, bisect_left(span.month_idx[death_day], count))
+        return rendered[:n]
+
+
+# 吉日索引默认展开的月数；按天重建
+_BURNING_CALENDAR_MONTHS = 12
+_burning_calendar: Optional[_BurningCalendar] = None
+_burning_calendar_lock = threading.Lock()
+
+
+def _get_burning_calendar(today: date) -> _BurningCalendar:
+    global _burning_calendar
+    calendar = _burning_calendar
+    if calendar is not None and calendar.today == today:
+        return calendar
+    with _burning_calendar_lock:
+        if _burning_calendar is None or _burning_calendar.today != today:
+            _burning_calendar = _BurningCalendar(today, _BURNING_CALENDAR_MONTHS)
+        return _burning_calendar
+
+
+def get_burning_dates(
+    death_date: date, today: date, count: int = 6, locale: str = DEFAULT_LOCALE
+) -> List[Tuple[str, str]]:
+    """
+    生成建议焚烧日期列表：从本月/下月起，每月取吉日，避开与死亡日「冲」的日期。
+    结果查自按天重建的吉日索引，count 可远大于 6。
+    返回 [(日期, 说明), ...]
+    """
+    return _get_burning_calendar(today).lookup(death_date.day, count, locale)
 
 
-def _format_date_desc(d: date) -> str:
-    """日期说明：满月/吉日等（中文），locale=en 时由上层统一翻译。"""
+def _format_date_desc(d: date, locale: str = DEFAULT_LOCALE) -> str:
+    """日期说明：满月/吉日等，按 locale 渲染 calculate.dateDesc 模板。"""
     if d.day == 15:
-        return "满月吉日，阴阳最和"
+        return render("calculate.dateDesc.fullMoon", locale)
     if d.day in (1, 8, 18, 28):
-        return "数理吉日，宜祭祀"
-    return "五行相生之日，宜焚烧"
+        return render("calculate.dateDesc.lucky", locale)
+    return render("calculate.dateDesc.wuxing", locale)
 
 
 def build_explanation(
@@ -194,16 +329,17 @@ def build_explanation(
     pet_months: int,
     quantity: int,
     burning_dates: List[Tuple[str, str]],
+    locale: str = DEFAULT_LOCALE,
 ) -> str:
-    """生成玄学解释文案。"""
+    """生成玄学解释文案，按 locale 渲染 calculate.explanation 模板。"""
     parts = [
-        f"自离世之日至今，已历{pet_months}个宠物月（合人年{pet_months}载）。",
-        "通过焚烧，助宠物轮回，守护阴阳平衡。",
-        f"本次建议焚烧数量为{quantity}，取吉数以利往生。",
+        render("calculate.explanation.petMonths", locale, petMonths=pet_months),
+        render("calculate.explanation.ritual", locale),
+        render("calculate.explanation.quantity", locale, quantity=quantity),
     ]
     if burning_dates:
-        parts.append("所选吉日避冲煞、应五行，可于所列日期行祭。")
-    return "".join(parts)
+        parts.append(render("calculate.explanation.dates", locale))
+    return join_sentences(parts, locale)
 
 
 def _auth_locale() -> str:
@@ -233,6 +369,12 @@ def register():
     if len(username) < 2 or len(username) > 64:
         return jsonify({"error": _error_message("auth_username_password_required", locale)}), 400
 
+    # 先哈希再取连接，避免哈希期间占用连接池
+    try:
+        password_hash = hash_password(password)
+    except PasswordHasherBusy:
+        return jsonify({"error": _error_message("auth_busy", locale)}), 503
+
     try:
         conn = get_connection()
     except Exception as e:
@@ -243,9 +385,11 @@ def register():
         with cursor(conn) as cur:
             cur.execute(
                 "INSERT INTO users (username, password_hash) VALUES (%s, %s)",
-                (username, hash_password(password)),
+                (username, password_hash),
             )
             user_id = cur.lastrowid
+            stat_counters.increment(cur, stat_counters.USERS_TOTAL)
+            user_search.index_user(cur, user_id, username)
         conn.commit()
     except Exception as e:
         if "Duplicate" in str(e) or "1062" in str(e) or "UNIQUE" in str(e):
@@ -281,11 +425,15 @@ def admin_login():
         with cursor(conn) as cur:
             cur.execute("SELECT id, password_hash FROM admins WHERE username = %s", (username,))
             row = cur.fetchone()
-        if not row or not verify_password(password, row["password_hash"]):
-            return jsonify({"error": _error_message("auth_invalid_credentials", locale)}), 401
-        admin_id = row["id"]
     finally:
         conn.close()
+    try:
+        if not row or not verify_password(password, row["password_hash"]):
+            return jsonify({"error": _error_message("auth_invalid_credentials", locale)}), 401
+    except PasswordHasherBusy:
+        return jsonify({"error": _error_message("auth_busy", locale)}), 503
+    admin_id = row["id"]
+    _upgrade_password_hash("admins", admin_id, password, row["password_hash"])
 
     token = encode_token(admin_id, username, is_admin=True)
     return jsonify({"token": token, "user": {"id": str(admin_id), "username": username}})
@@ -312,16 +460,41 @@ def login():
         with cursor(conn) as cur:
             cur.execute("SELECT id, password_hash FROM users WHERE username = %s", (username,))
             row = cur.fetchone()
-        if not row or not verify_password(password, row["password_hash"]):
-            return jsonify({"error": _error_message("auth_invalid_credentials", locale)}), 401
-        user_id = row["id"]
     finally:
         conn.close()
+    try:
+        if not row or not verify_password(password, row["password_hash"]):
+            return jsonify({"error": _error_message("auth_invalid_credentials", locale)}), 401
+    except PasswordHasherBusy:
+        return jsonify({"error": _error_message("auth_busy", locale)}), 503
+    user_id = row["id"]
+    _upgrade_password_hash("users", user_id, password, row["password_hash"])
 
     token = encode_token(user_id, username)
     return jsonify({"token": token, "user": {"id": str(user_id), "username": username}})
 
 
+def _upgrade_password_hash(table: str, row_id, password: str, old_hash: str) -> None:
+    """登录成功后，若旧哈希的算法/参数与当前配置不同则重新哈希写回；失败不影响登录。"""
+    if not needs_rehash(old_hash):
+        return
+    try:
+        new_hash = hash_password(password)
+        conn = get_connection()
+        try:
+            with cursor(conn) as cur:
+                # 仅当哈希未被并发修改（如改密）时才覆盖
+                cur.execute(
+                    f"UPDATE {table} SET password_hash = %s WHERE id = %s AND password_hash = %s",
+                    (new_hash, row_id, old_hash),
+                )
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception:
+        pass
+
+
 def _current_user():
     """从 Authorization: Bearer <token> 解析当前用户，失败返回 None。"""
     auth = request.headers.get("Authorization") or ""
@@ -344,13 +517,52 @@ def _current_admin():
 
 # ===== 管理员 API 端点 =====
 
+def _fetch_page(cur, select_sql: str, where: list, params: list, page: int, per_page: int,
+                keyset: bool, before_id: Optional[int]) -> Tuple[list, Optional[str]]:
+    """按 id 倒序取一页（多取一行判断是否还有下一页），返回 (rows, next_cursor)。
+    keyset 模式用 id < before_id 走主键范围扫描，耗时与页码无关；否则按 page 计算 OFFSET。"""
+    per_page = max(1, per_page)
+    where, params = list(where), list(params)
+    if keyset and before_id is not None:
+        where.append("id < %s")
+        params.append(before_id)
+    sql = select_sql + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY id DESC LIMIT %s"
+    params.append(per_page + 1)
+    if not keyset:
+        sql += " OFFSET %s"
+        params.append((max(1, page) - 1) * per_page)
+    cur.execute(sql, tuple(params))
+    return pagination.page_meta(list(cur.fetchall()), per_page)
+
+
+def _list_total(cur, mode: str, table: str, where: list, params: list,
+                approx: Optional[Callable[[], int]] = None) -> Optional[int]:
+    """列表总数：exact 每次 COUNT(*)；approx 优先用 approx()（如读统计计数器），否则用短期缓存的 COUNT(*)；none 不计算。"""
+    if mode == "none":
+        return None
+    sql = f"SELECT COUNT(*) AS cnt FROM {table}" + (" WHERE " + " AND ".join(where) if where else "")
+
+    def count() -> int:
+        cur.execute(sql, tuple(params))
+        return int(cur.fetchone()["cnt"])
+
+    if mode == "exact":
+        return count()
+    if approx is not None:
+        return approx()
+    return pagination.count_cache.get((table, sql, tuple(params)), count)
+
+
 @app.route("/api/admin/language-strings", methods=["GET"])
 def get_language_strings():
-    """获取所有多语言字符串 (分页或全部)。"""
+    """获取所有多语言字符串 (分页或全部)。带 cursor/before_id 时为 keyset 分页，返回 {items, next_cursor, total}。"""
     admin = _current_admin()
     if not admin:
         return jsonify({"error": "Unauthorized"}), 401
 
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 100, type=int)
+    keyset, before_id = pagination.before_id_from_args(request.args)
     try:
         conn = get_connection()
     except Exception as e:
@@ -358,40 +570,50 @@ def get_language_strings():
 
     try:
         with cursor(conn) as cur:
-            # 支持分页参数
-            page = request.args.get("page", 1, type=int)
-            per_page = request.args.get("per_page", 100, type=int)
-            offset = (page - 1) * per_page
-
-            cur.execute(
-                "SELECT id, `key`, zh, en, category, updated_at FROM language_strings ORDER BY id DESC LIMIT %s OFFSET %s",
-                (per_page, offset),
+            rows, next_cursor = _fetch_page(
+                cur, "SELECT id, `key`, zh, en, category, updated_at FROM language_strings",
+                [], [], page, per_page, keyset, before_id,
             )
+            if not keyset:
+                # 兼容旧调用：OFFSET 分页仍返回数组
+                return jsonify([dict(row) if not isinstance(row, dict) else row for row in rows]), 200
+            total = _list_total(cur, pagination.total_mode(request.args, keyset), "language_strings", [], [])
+        return jsonify({"items": [dict(r) for r in rows], "next_cursor": next_cursor, "total": total}), 200
+    finally:
+        conn.close()
+
+
+def _build_language_bundles() -> dict:
+    """读取 language_strings 并为每个 locale 生成序列化、预压缩好的响应体，{locale: CachedBody}。"""
+    conn = get_connection()
+    try:
+        with cursor(conn) as cur:
+            cur.execute("SELECT `key`, zh, en FROM language_strings")
             rows = cur.fetchall()
-        
-        return jsonify([dict(row) if not isinstance(row, dict) else row for row in rows]), 200
     finally:
         conn.close()
+    bundles = {}
+    for locale in SUPPORTED_LOCALES:
+        field = "zh" if locale == "zh" else "en"
+        data = _expand_language_rows(rows, field)
+        bundles[locale] = CachedBody(f"{_json_dumps(data)}\n".encode("utf-8"))
+    return bundles
+
+
+# 多语言包缓存：admin 增删改 language_strings 时 bump 版本号，各 worker 轮询后重建
+LANGUAGE_BUNDLE_CACHE = "language_strings"
+_language_bundles = VersionedCache(LANGUAGE_BUNDLE_CACHE, _build_language_bundles)
 
 
 @app.route("/api/language-strings", methods=["GET"])
 def public_language_strings():
-    """C 端：获取多语言字符串，结构与原来的 zh.json/en.json 类似。"""
+    """C 端：获取多语言字符串，结构与原来的 zh.json/en.json 类似（内存中的预序列化语言包，支持 ETag/304）。"""
     locale = _normalize_locale(request.args.get("locale", "zh"))
-    field = "zh" if locale == "zh" else "en"
     try:
-        conn = get_connection()
+        bundles = _language_bundles.get()
     except Exception:
         return jsonify({}), 200
-
-    try:
-        with cursor(conn) as cur:
-            cur.execute("SELECT `key`, zh, en FROM language_strings")
-            rows = cur.fetchall()
-        data = _expand_language_rows(rows, field)
-        return jsonify(data), 200
-    finally:
-        conn.close()
+    return bundles[locale].response()
 
 
 @app.route("/api/admin/language-strings", methods=["POST"])
@@ -421,7 +643,9 @@ def create_language_string():
                 "INSERT INTO language_strings (`key`, zh, en, category) VALUES (%s, %s, %s, %s)",
                 (key, zh, en, category),
             )
+            bump_version(cur, LANGUAGE_BUNDLE_CACHE)
         conn.commit()
+        _language_bundles.invalidate()
         return jsonify({"message": "Created"}), 201
     except Exception as e:
         if "Duplicate" in str(e) or "1062" in str(e) or "UNIQUE" in str(e):
@@ -463,7 +687,9 @@ def update_language_string(string_id: int):
                     "UPDATE language_strings SET zh = %s, en = %s, category = %s, updated_at = datetime('now') WHERE id = %s",
                     (zh, en, category or "common", string_id),
                 )
+            bump_version(cur, LANGUAGE_BUNDLE_CACHE)
         conn.commit()
+        _language_bundles.invalidate()
         return jsonify({"message": "Updated"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -486,7 +712,9 @@ def delete_language_string(string_id: int):
     try:
         with cursor(conn) as cur:
             cur.execute("DELETE FROM language_strings WHERE id = %s", (string_id,))
+            bump_version(cur, LANGUAGE_BUNDLE_CACHE)
         conn.commit()
+        _language_bundles.invalidate()
         return jsonify({"message": "Deleted"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -497,14 +725,14 @@ def delete_language_string(string_id: int):
 # ----- 用户管理 -----
 @app.route("/api/admin/users", methods=["GET"])
 def admin_list_users():
-    """管理员：用户列表，分页与搜索。"""
+    """管理员：用户列表，分页与搜索。列表按 id 倒序（OFFSET 或 keyset 分页）；搜索走 n-gram 索引，按相关度排序。"""
     admin = _current_admin()
     if not admin:
         return jsonify({"error": "Unauthorized"}), 401
     page = request.args.get("page", 1, type=int)
     per_page = min(request.args.get("per_page", 20, type=int), 100)
-    search = (request.args.get("search") or "").strip()
-    offset = (page - 1) * per_page
+    search = (request.args.get("search") or "").strip()[:64]
+    keyset, before_id = pagination.before_id_from_args(request.args)
     try:
         conn = get_connection()
     except Exception as e:
@@ -512,33 +740,23 @@ def admin_list_users():
     try:
         with cursor(conn) as cur:
             if search:
-                if IS_PRODUCTION:
-                    cur.execute(
-                        "SELECT id, username, created_at FROM users WHERE username LIKE %s ORDER BY id DESC LIMIT %s OFFSET %s",
-                        ("%" + search + "%", per_page, offset),
-                    )
-                else:
-                    cur.execute(
-                        "SELECT id, username, created_at FROM users WHERE username LIKE ? ORDER BY id DESC LIMIT ? OFFSET ?",
-                        ("%" + search + "%", per_page, offset),
-                    )
+                # 相关度排序无法按 id 续页，cursor 记录偏移量
+                offset = pagination.offset_from_args(request.args, page, per_page)
+                rows = user_search.search(cur, search, per_page + 1, offset)
+                rows, next_cursor = pagination.offset_page_meta(rows, per_page, offset)
+                clause, params = user_search.where_clause(cur, search)
+                total = _list_total(cur, pagination.total_mode(request.args, bool(request.args.get("cursor"))), "users", [clause], params)
             else:
-                cur.execute(
-                    "SELECT id, username, created_at FROM users ORDER BY id DESC LIMIT %s OFFSET %s" if IS_PRODUCTION else
-                    "SELECT id, username, created_at FROM users ORDER BY id DESC LIMIT ? OFFSET ?",
-                    (per_page, offset) if IS_PRODUCTION else (per_page, offset),
+                rows, next_cursor = _fetch_page(
+                    cur, "SELECT id, username, created_at FROM users",
+                    [], [], page, per_page, keyset, before_id,
+                )
+                total = _list_total(
+                    cur, pagination.total_mode(request.args, keyset), "users", [], [],
+                    approx=lambda: stat_counters.read(cur, stat_counters.USERS_TOTAL)[stat_counters.USERS_TOTAL],
                 )
-            rows = cur.fetchall()
-            if search:
-                if IS_PRODUCTION:
-                    cur.execute("SELECT COUNT(*) AS cnt FROM users WHERE username LIKE %s", ("%" + search + "%",))
-                else:
-                    cur.execute("SELECT COUNT(*) AS cnt FROM users WHERE username LIKE ?", ("%" + search + "%",))
-            else:
-                cur.execute("SELECT COUNT(*) AS cnt FROM users")
-            total = cur.fetchone()["cnt"]
         items = [{"id": r["id"], "username": r["username"], "created_at": r["created_at"]} for r in rows]
-        return jsonify({"items": items, "total": total}), 200
+        return jsonify({"items": items, "total": total, "next_cursor": next_cursor}), 200
     finally:
         conn.close()
 
@@ -546,60 +764,183 @@ def admin_list_users():
 # ----- 统计 -----
 @app.route("/api/admin/stats", methods=["GET"])
 def admin_stats():
-    """管理员：基础统计（用户总数、今日活跃、计算次数）。"""
+    """管理员：基础统计（用户总数、今日活跃、计算次数），读取 stat_counters 计数器。"""
     admin = _current_admin()
     if not admin:
         return jsonify({"error": "Unauthorized"}), 401
+    today_key = stat_counters.calculates_day(date.today())
     try:
         conn = get_connection()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     try:
         with cursor(conn) as cur:
-            cur.execute("SELECT COUNT(*) AS cnt FROM users")
-            total_users = cur.fetchone()["cnt"]
-            if IS_PRODUCTION:
-                cur.execute("SELECT COUNT(*) AS cnt FROM calculate_logs WHERE DATE(created_at) = CURDATE()")
-            else:
-                cur.execute("SELECT COUNT(*) AS cnt FROM calculate_logs WHERE date(created_at) = date('now')")
-            today_calculates = cur.fetchone()["cnt"]
-            cur.execute("SELECT COUNT(*) AS cnt FROM calculate_logs")
-            total_calculates = cur.fetchone()["cnt"]
+            values = stat_counters.read(cur, stat_counters.USERS_TOTAL, stat_counters.CALCULATES_TOTAL, today_key)
         return jsonify({
-            "total_users": total_users,
-            "today_calculates": today_calculates,
-            "total_calculates": total_calculates,
+            "total_users": values[stat_counters.USERS_TOTAL],
+            "today_calculates": values[today_key],
+            "total_calculates": values[stat_counters.CALCULATES_TOTAL],
         }), 200
     finally:
         conn.close()
 
 
+@app.route("/api/admin/stats/reconcile", methods=["POST"])
+def admin_reconcile_stats():
+    """管理员：用 COUNT(*) 重新校准统计计数器（总数与最近 7 天每日计算次数）。"""
+    admin = _current_admin()
+    if not admin:
+        return jsonify({"error": "Unauthorized"}), 401
+    days = min(max(request.args.get("days", 7, type=int), 1), 366)
+    try:
+        conn = get_connection()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    try:
+        return jsonify(stat_counters.reconcile(conn, days=days)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        conn.close()
+
+
+@app.route("/api/admin/db-pool", methods=["GET"])
+def admin_db_pool():
+    """管理员：当前 worker 的数据库连接池统计（借出次数、等待时间），用于调整池大小。"""
+    admin = _current_admin()
+    if not admin:
+        return jsonify({"error": "Unauthorized"}), 401
+    return jsonify(pool_stats()), 200
+
+
+@app.route("/api/admin/slow-queries", methods=["GET"])
+def admin_slow_queries():
+    """管理员：当前 worker 按 SQL 指纹聚合的耗时排行。?sort=total|max|count|avg&limit=20"""
+    admin = _current_admin()
+    if not admin:
+        return jsonify({"error": "Unauthorized"}), 401
+    sort = request.args.get("sort", "total")
+    if sort not in ("total", "max", "count", "avg"):
+        return jsonify({"error": "sort must be total, max, count or avg"}), 400
+    try:
+        limit = max(1, min(int(request.args.get("limit", 20)), 200))
+    except (TypeError, ValueError):
+        return jsonify({"error": "limit must be an integer"}), 400
+    return jsonify({
+        "enabled": QUERY_STATS_ENABLED,
+        "slow_query_ms": SLOW_QUERY_MS,
+        "fingerprints": len(query_stats.query_stats),
+        "items": query_stats.query_stats.top(limit, sort),
+    }), 200
+
+
+@app.route("/api/admin/cache-stats", methods=["GET"])
+def admin_cache_stats():
+    """管理员：当前 worker 的进程内缓存命中统计。"""
+    admin = _current_admin()
+    if not admin:
+        return jsonify({"error": "Unauthorized"}), 401
+    return jsonify({
+        "calculate_results": _calculate_cache.stats(),
+        "language_bundles": _language_bundles.stats(),
+        "announcements": _announcements.stats(),
+        "site_settings": site_settings.stats(),
+        "tokens": token_cache_stats(),
+    }), 200
+
+
+@app.route("/api/admin/metrics", methods=["GET"])
+def admin_metrics():
+    """管理员（或携带 METRICS_TOKEN 的抓取端）：全部 worker 合并后的请求与阶段耗时直方图，Prometheus 文本格式。"""
+    auth = request.headers.get("Authorization", "")
+    scraper = bool(METRICS_TOKEN) and auth.startswith("Bearer ") and hmac.compare_digest(auth[7:].strip(), METRICS_TOKEN)
+    if not scraper and not _current_admin():
+        return jsonify({"error": "Unauthorized"}), 401
+    return app.response_class(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/api/admin/translation-cache", methods=["GET"])
+def admin_translation_cache():
+    """管理员：当前 worker 的翻译缓存命中统计。"""
+    admin = _current_admin()
+    if not admin:
+        return jsonify({"error": "Unauthorized"}), 401
+    return jsonify(translation_cache_stats()), 200
+
+
 # ----- 计算日志 -----
 @app.route("/api/admin/calculate-logs", methods=["GET"])
 def admin_calculate_logs():
-    """管理员：计算请求日志，分页。"""
+    """管理员：计算请求日志，分页（OFFSET 或 keyset 分页）。"""
     admin = _current_admin()
     if not admin:
         return jsonify({"error": "Unauthorized"}), 401
     page = request.args.get("page", 1, type=int)
     per_page = min(request.args.get("per_page", 20, type=int), 100)
-    offset = (page - 1) * per_page
+    keyset, before_id = pagination.before_id_from_args(request.args)
     try:
         conn = get_connection()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     try:
         with cursor(conn) as cur:
-            cur.execute(
-                "SELECT id, user_id, pet_name, death_date, locale, created_at FROM calculate_logs ORDER BY id DESC LIMIT %s OFFSET %s" if IS_PRODUCTION else
-                "SELECT id, user_id, pet_name, death_date, locale, created_at FROM calculate_logs ORDER BY id DESC LIMIT ? OFFSET ?",
-                (per_page, offset) if IS_PRODUCTION else (per_page, offset),
+            rows, next_cursor = _fetch_page(
+                cur, "SELECT id, user_id, pet_name, death_date, locale, created_at FROM calculate_logs",
+                [], [], page, per_page, keyset, before_id,
+            )
+            total = _list_total(
+                cur, pagination.total_mode(request.args, keyset), "calculate_logs", [], [],
+                approx=lambda: stat_counters.live_calculates(cur),
             )
-            rows = cur.fetchall()
-            cur.execute("SELECT COUNT(*) AS cnt FROM calculate_logs")
-            total = cur.fetchone()["cnt"]
         items = [dict(r) for r in rows]
-        return jsonify({"items": items, "total": total}), 200
+        return jsonify({"items": items, "total": total, "next_cursor": next_cursor}), 200
+    finally:
+        conn.close()
+
+
+@app.route("/api/admin/calculate-logs/export", methods=["GET"])
+def admin_export_calculate_logs():
+    """
+    管理员：流式导出计算日志。?format=csv|ndjson（默认 csv）&start=YYYY-MM-DD&end=YYYY-MM-DD
+    &locale=zh|en&include_result=1&gzip=1。按 id 升序，服务端游标逐批输出，内存占用与行数无关。
+    """
+    admin = _current_admin()
+    if not admin:
+        return jsonify({"error": "Unauthorized"}), 401
+    fmt = (request.args.get("format") or "csv").lower()
+    if fmt not in log_export.FORMATS:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    try:
+        start = log_export.parse_day(request.args.get("start"))
+        end = log_export.parse_day(request.args.get("end"))
+    except ValueError:
+        return jsonify({"error": "start/end must be YYYY-MM-DD"}), 400
+    locale = (request.args.get("locale") or "").strip() or None
+    include_result = request.args.get("include_result") in ("1", "true")
+    use_gzip = request.args.get("gzip") in ("1", "true")
+
+    filename = f"calculate_logs.{fmt}" + (".gz" if use_gzip else "")
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    body = log_export.export(fmt, start, end, locale, include_result, gzip=use_gzip)
+    resp = app.response_class(stream_with_context(body), mimetype="application/gzip" if use_gzip else mimetype)
+    resp.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    # 告知 nginx 不要缓冲整个导出
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+@app.route("/api/admin/calculate-logs/retention", methods=["GET"])
+def admin_calculate_logs_retention():
+    """管理员：calculate_logs 的保留期、各月分区行数与归档文件。清理与恢复由 scripts/retention.sh 执行。"""
+    admin = _current_admin()
+    if not admin:
+        return jsonify({"error": "Unauthorized"}), 401
+    try:
+        conn = get_connection()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    try:
+        return jsonify(retention.status(conn)), 200
     finally:
         conn.close()
 
@@ -646,17 +987,9 @@ def admin_upsert_setting():
         return jsonify({"error": str(e)}), 500
     try:
         with cursor(conn) as cur:
-            if IS_PRODUCTION:
-                cur.execute(
-                    "INSERT INTO site_settings (`key`, value) VALUES (%s, %s) ON DUPLICATE KEY UPDATE value = VALUES(value), updated_at = NOW()",
-                    (key, str(value)),
-                )
-            else:
-                cur.execute(
-                    'INSERT INTO site_settings ("key", value) VALUES (?, ?) ON CONFLICT("key") DO UPDATE SET value = excluded.value, updated_at = datetime(\'now\')',
-                    (key, str(value)),
-                )
+            site_settings.upsert(cur, key, str(value))
         conn.commit()
+        site_settings.changed()
         return jsonify({"message": "OK"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -716,7 +1049,9 @@ def admin_create_announcement():
                     (title, body, locale, active, start_at, end_at),
                 )
             lid = cur.lastrowid
+            bump_version(cur, ANNOUNCEMENT_CACHE)
         conn.commit()
+        _announcements.invalidate()
         return jsonify({"message": "Created", "id": lid}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -753,7 +1088,9 @@ def admin_update_announcement(aid: int):
                     "UPDATE announcements SET title = COALESCE(?, title), body = COALESCE(?, body), locale = COALESCE(?, locale), active = COALESCE(?, active), start_at = ?, end_at = ?, updated_at = datetime('now') WHERE id = ?",
                     (title, body, locale, active, start_at, end_at, aid),
                 )
+            bump_version(cur, ANNOUNCEMENT_CACHE)
         conn.commit()
+        _announcements.invalidate()
         return jsonify({"message": "Updated"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -774,7 +1111,9 @@ def admin_delete_announcement(aid: int):
     try:
         with cursor(conn) as cur:
             cur.execute("DELETE FROM announcements WHERE id = %s" if IS_PRODUCTION else "DELETE FROM announcements WHERE id = ?", (aid,))
+            bump_version(cur, ANNOUNCEMENT_CACHE)
         conn.commit()
+        _announcements.invalidate()
         return jsonify({"message": "Deleted"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -782,31 +1121,26 @@ def admin_delete_announcement(aid: int):
         conn.close()
 
 
+def _render_announcements(items: list) -> bytes:
+    return f"{_json_dumps(items)}\n".encode("utf-8")
+
+
+# 公告缓存：管理端增删改时 bump 版本号；生效时间窗到下一个 start_at / end_at 边界为止，到期后在内存中重新筛选
+_announcements = VersionedCache(ANNOUNCEMENT_CACHE, lambda: load_schedule(_render_announcements))
+
+
 @app.route("/api/announcements", methods=["GET"])
 def public_announcements():
-    """C 端：获取当前生效的公告列表，按 locale 过滤。"""
+    """C 端：获取当前生效的公告列表，按 locale 过滤（内存中的时间窗缓存，支持 ETag/304）。"""
     locale = _normalize_locale(request.args.get("locale", "zh"))
     try:
-        conn = get_connection()
+        schedule = _announcements.get()
     except Exception:
         return jsonify([]), 200
-    try:
-        with cursor(conn) as cur:
-            if IS_PRODUCTION:
-                cur.execute(
-                    "SELECT id, title, body FROM announcements WHERE active = 1 AND locale = %s AND (start_at IS NULL OR start_at <= NOW()) AND (end_at IS NULL OR end_at >= NOW()) ORDER BY id DESC",
-                    (locale,),
-                )
-            else:
-                cur.execute(
-                    "SELECT id, title, body FROM announcements WHERE active = 1 AND locale = ? AND (start_at IS NULL OR start_at <= datetime('now')) AND (end_at IS NULL OR end_at >= datetime('now')) ORDER BY id DESC",
-                    (locale,),
-                )
-            rows = cur.fetchall()
-        out = [{"id": r["id"], "title": r["title"], "body": r["body"]} for r in rows]
-        return jsonify(out), 200
-    finally:
-        conn.close()
+    cached, remaining = schedule.get(locale)
+    # 浏览器缓存不跨过下一个生效/失效时刻
+    max_age = PUBLIC_CACHE_MAX_AGE if remaining is None else min(PUBLIC_CACHE_MAX_AGE, remaining)
+    return cached.response(max_age)
 
 
 @app.route("/api/auth/me", methods=["GET"])
@@ -819,52 +1153,86 @@ def me():
     return jsonify({"user": user})
 
 
-@app.route("/api/calculate", methods=["POST"])
-def calculate():
-    """
-    请求体: { "deathDate": "YYYY-MM-DD", "petName": "可选", "locale": "zh"|"en"|... }
-    响应: petMonths, burningDates, suggestedQuantity, explanation（按 locale 返回或翻译）
-    """
-    data = request.get_json() or {}
-    death_date_str = data.get("deathDate")
-    pet_name = data.get("petName", "")
-    locale = _get_locale(data)
+# petName 占位：预序列化响应体时在此处切开，请求时拼入实际 petName
+_PET_NAME_SLOT = "\x00petName\x00"
 
-    if not death_date_str:
-        return jsonify({"error": _error_message("deathDate_required", locale)}), 400
 
-    try:
-        death_date = datetime.strptime(death_date_str.strip()[:10], "%Y-%m-%d").date()
-    except ValueError:
-        return jsonify({"error": _error_message("deathDate_invalid", locale)}), 400
+class _CalculateResult:
+    """一次计算的结果（不含 petName）及其预序列化的响应体。"""
 
-    today = date.today()
-    if death_date > today:
-        return jsonify({"error": _error_message("deathDate_future", locale)}), 400
+    __slots__ = ("fields", "_head", "_tail")
+
+    def __init__(self, fields: dict):
+        self.fields = fields
+        body = _json_dumps({**fields, "petName": _PET_NAME_SLOT})
+        self._head, self._tail = body.split(_json_dumps(_PET_NAME_SLOT), 1)
+
+    def body(self, pet_name) -> str:
+        return f"{self._head}{_json_dumps(pet_name)}{self._tail}\n"
 
+    def response(self, pet_name):
+        return app.response_class(self.body(pet_name), mimetype=app.json.mimetype)
+
+
+def _compute_result(death_date: date, today: date, locale: str) -> _CalculateResult:
     pet_months = get_pet_months(death_date, today)
     raw_q = get_lucky_quantity_raw(
         death_date.day, death_date.month, pet_months
     )
     quantity = to_lucky_quantity(raw_q)
-    burning_dates = get_burning_dates(death_date, today)
-    explanation = build_explanation(death_date, pet_months, quantity, burning_dates)
-
-    if locale in TRANSLATABLE_LOCALES:
-        explanation = translate_zh_to_en(explanation)
-        descs = translate_zh_to_en_batch([desc for _, desc in burning_dates])
-        burning_dates = [(d, descs[i]) for i, (d, _) in enumerate(burning_dates)]
-
-    result = {
+    burning_dates = get_burning_dates(death_date, today, locale=locale)
+    explanation = build_explanation(death_date, pet_months, quantity, burning_dates, locale)
+    return _CalculateResult({
         "petMonths": pet_months,
         "deathDate": death_date.isoformat(),
-        "petName": pet_name,
         "suggestedQuantity": quantity,
         "burningDates": [{"date": d, "desc": desc} for d, desc in burning_dates],
         "explanation": explanation,
-    }
+    })
+
+
+# 计算结果只取决于 (死亡日期, 今日, locale)：按天缓存，跨午夜整体失效
+_calculate_cache = DayScopedLRU(CALCULATE_CACHE_SIZE)
+
 
-    # 记录计算日志（用于运营统计）
+def _parse_calculate_item(data: dict, today: date) -> Tuple[Optional[date], object, str, Optional[str]]:
+    """校验一条计算请求，返回 (death_date, pet_name, locale, 错误 key 或 None)。"""
+    death_date_str = data.get("deathDate")
+    pet_name = data.get("petName", "")
+    locale = _get_locale(data)
+
+    if not death_date_str:
+        return None, pet_name, locale, "deathDate_required"
+    if not isinstance(death_date_str, str):
+        return None, pet_name, locale, "deathDate_invalid"
+    try:
+        death_date = datetime.strptime(death_date_str.strip()[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None, pet_name, locale, "deathDate_invalid"
+    if death_date > today:
+        return None, pet_name, locale, "deathDate_future"
+    return death_date, pet_name, locale, None
+
+
+@app.route("/api/calculate", methods=["POST"])
+def calculate():
+    """
+    请求体: { "deathDate": "YYYY-MM-DD", "petName": "可选", "locale": "zh"|"en"|... }
+    响应: petMonths, burningDates, suggestedQuantity, explanation（按 locale 渲染模板）
+    """
+    data = request.get_json() or {}
+    today = date.today()
+    death_date, pet_name, locale, error = _parse_calculate_item(data, today)
+    if error:
+        return jsonify({"error": _error_message(error, locale)}), 400
+
+    cache_key = (death_date, today, locale)
+    computed = _calculate_cache.get(cache_key, today)
+    if computed is None:
+        computed = _compute_result(death_date, today, locale)
+        _calculate_cache.set(cache_key, computed, today)
+
+    # 记录计算日志（用于运营统计）：放入队列由后台线程批量写库，不阻塞响应
     try:
         user = _current_user()
         user_id = None
@@ -873,27 +1241,157 @@ def calculate():
                 user_id = int(user["id"])
             except (TypeError, ValueError):
                 pass
-        conn = get_connection()
-        try:
-            import json
-            with cursor(conn) as cur:
-                if IS_PRODUCTION:
-                    cur.execute(
-                        "INSERT INTO calculate_logs (user_id, pet_name, death_date, locale, result_json) VALUES (%s, %s, %s, %s, %s)",
-                        (user_id, (pet_name or "")[:128], death_date.isoformat(), locale, json.dumps(result)),
-                    )
-                else:
-                    cur.execute(
-                        "INSERT INTO calculate_logs (user_id, pet_name, death_date, locale, result_json) VALUES (?, ?, ?, ?, ?)",
-                        (user_id, (pet_name or "")[:128], death_date.isoformat(), locale, json.dumps(result)),
-                    )
-            conn.commit()
-        finally:
-            conn.close()
+        calculate_log_writer.submit(user_id, pet_name, death_date.isoformat(), locale, computed.fields)
     except Exception:
         pass
 
-    return jsonify(result)
+    return computed.response(pet_name)
+
+
+# 批量计算每块条数：块内向量化计算，逐块流式输出
+_BATCH_CHUNK_SIZE = 1024
+
+
+def _batch_months_and_quantities(death_dates: List[date], today: date) -> Tuple[List[int], List[int]]:
+    """批量计算宠物月数与吉数数量：规则同 get_pet_months / get_lucky_quantity_raw / to_lucky_quantity。"""
+    if np is None:
+        months = [get_pet_months(d, today) for d in death_dates]
+        quantities = [
+            to_lucky_quantity(get_lucky_quantity_raw(d.day, d.month, m))
+            for d, m in zip(death_dates, months)
+        ]
+        return months, quantities
+    dd = np.array(death_dates, dtype="datetime64[D]")
+    month_start = dd.astype("datetime64[M]")
+    years = dd.astype("datetime64[Y]").astype(np.int64) + 1970
+    mons = month_start.astype(np.int64) % 12 + 1
+    days = (dd - month_start).astype(np.int64) + 1
+    months = (today.year - years) * 12 + (today.month - mons) - (today.day < days)
+    months = np.maximum(months, 0)
+    raw = (days + mons + months) % 10
+    raw[raw == 0] = 10
+    return months.tolist(), _QUANTITY_TABLE[raw].tolist()
+
+
+# raw（1-10）到吉数数量的查表，供向量化计算使用
+_QUANTITY_TABLE = np.array([to_lucky_quantity(r) for r in range(11)]) if np is not None else None
+
+
+def _calculate_chunk(items: List[dict], today: date) -> Iterator[str]:
+    """计算一块批量条目，按输入顺序产出与单条接口响应体完全一致的 JSON 行。"""
+    parsed = [_parse_calculate_item(item if isinstance(item, dict) else {}, today) for item in items]
+    results = {}
+    misses = []
+    for death_date, _, locale, error in parsed:
+        if error:
+            continue
+        key = (death_date, today, locale)
+        if key in results:
+            continue
+        cached = _calculate_cache.get(key, today)
+        if cached is not None:
+            results[key] = cached
+        else:
+            results[key] = None
+            misses.append(key)
+
+    if misses:
+        months, quantities = _batch_months_and_quantities([k[0] for k in misses], today)
+        # 吉日列表只取决于 (死亡日的「日」, locale)，解释只取决于 (月数, 数量, locale)
+        dates_memo = {}
+        explanation_memo = {}
+        for (death_date, _, locale), pet_months, quantity in zip(misses, months, quantities):
+            dk = (death_date.day, locale)
+            if dk not in dates_memo:
+                dates_memo[dk] = get_burning_dates(death_date, today, locale=locale)
+            burning_dates = dates_memo[dk]
+            ek = (pet_months, quantity, bool(burning_dates), locale)
+            if ek not in explanation_memo:
+                explanation_memo[ek] = build_explanation(death_date, pet_months, quantity, burning_dates, locale)
+            computed = _CalculateResult({
+                "petMonths": pet_months,
+                "deathDate": death_date.isoformat(),
+                "suggestedQuantity": quantity,
+                "burningDates": [{"date": d, "desc": desc} for d, desc in burning_dates],
+                "explanation": explanation_memo[ek],
+            })
+            key = (death_date, today, locale)
+            results[key] = computed
+            _calculate_cache.set(key, computed, today)
+
+    for death_date, pet_name, locale, error in parsed:
+        if error:
+            yield _json_dumps({"error": _error_message(error, locale)}) + "\n"
+        else:
+            yield results[(death_date, today, locale)].body(pet_name)
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _iter_ndjson(stream) -> Iterator[dict]:
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield {}
+
+
+@app.route("/api/calculate/batch", methods=["POST"])
+def calculate_batch():
+    """
+    批量计算。请求体为 JSON 数组，或 Content-Type: application/x-ndjson 的逐行 JSON，
+    每条 { "deathDate", "petName"?, "locale"? }。
+    响应为 NDJSON 流，第 i 行对应第 i 条输入，内容与单条 /api/calculate 的响应体一致
+    （校验失败的条目为 { "error": ... }）。批量请求不写 calculate_logs。
+    """
+    locale = _get_locale({})
+    today = date.today()
+    mimetype = (request.mimetype or "").lower()
+
+    if mimetype in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        truncated = []
+
+        def limited(items):
+            for i, item in enumerate(items):
+                if i >= CALCULATE_BATCH_MAX_ITEMS:
+                    truncated.append(True)
+                    return
+                yield item
+
+        def generate_ndjson():
+            for chunk in _chunked(limited(_iter_ndjson(request.stream)), _BATCH_CHUNK_SIZE):
+                yield "".join(_calculate_chunk(chunk, today))
+            if truncated:
+                # 超出上限的条目不再计算，以一行错误结束
+                yield _json_dumps({"error": _error_message("batch_too_large", locale)}) + "\n"
+
+        return app.response_class(stream_with_context(generate_ndjson()), mimetype="application/x-ndjson")
+
+    items = request.get_json(silent=True)
+    if isinstance(items, dict) and isinstance(items.get("items"), list):
+        items = items["items"]
+    if not isinstance(items, list):
+        return jsonify({"error": _error_message("batch_invalid", locale)}), 400
+    if len(items) > CALCULATE_BATCH_MAX_ITEMS:
+        return jsonify({"error": _error_message("batch_too_large", locale)}), 400
+
+    def generate():
+        for chunk in _chunked(items, _BATCH_CHUNK_SIZE):
+            yield "".join(_calculate_chunk(chunk, today))
+
+    return app.response_class(stream_with_context(generate()), mimetype="application/x-ndjson")
 
 
 if __name__ == "__main__":
@@ -1,19 +1,109 @@
 """JWT 与密码校验。"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
 from typing import Optional
 
 import jwt
 from datetime import datetime, timedelta, timezone
 from werkzeug.security import generate_password_hash, check_password_hash
 
-from config import JWT_SECRET, JWT_EXPIRE_HOURS
+from config import (
+    JWT_SECRET,
+    JWT_EXPIRE_HOURS,
+    JWT_CACHE_SIZE,
+    PASSWORD_HASH_METHOD,
+    PASSWORD_HASH_SALT_LENGTH,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_TIMEOUT,
+)
+import metrics
+
+
+class PasswordHasherBusy(Exception):
+    """密码哈希线程池排队已满或等待超时，调用方应返回 503。"""
+
+
+class _PasswordHasher:
+    """
+    密码哈希专用的有界线程池（每个 worker 进程一份，fork 后按需重建）。
+    hashlib.pbkdf2_hmac / scrypt 计算时释放 GIL，不会拖住同进程其他线程；
+    进行中 + 排队的任务超过 workers + max_pending 时立即拒绝，登录洪峰不会无限堆积。
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float):
+        self.workers = max(1, workers)
+        self.max_pending = max(0, max_pending)
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _ensure(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+                    self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+                    self._pid = os.getpid()
+        return self._executor, self._slots
+
+    def run(self, fn, *args):
+        executor, slots = self._ensure()
+        if not slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self.rejected += 1
+            raise PasswordHasherBusy()
+
+
+_hasher = _PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_TIMEOUT)
 
 
 def hash_password(password: str) -> str:
-    return generate_password_hash(password, method="pbkdf2:sha256")
+    """按 PASSWORD_HASH_METHOD 生成哈希（在哈希线程池中执行）；排队已满时抛 PasswordHasherBusy。"""
+    with metrics.span("hash"):
+        return _hasher.run(generate_password_hash, password, PASSWORD_HASH_METHOD, PASSWORD_HASH_SALT_LENGTH)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
-    return check_password_hash(password_hash, password)
+    """校验密码（在哈希线程池中执行）；排队已满时抛 PasswordHasherBusy。"""
+    with metrics.span("hash"):
+        return _hasher.run(check_password_hash, password_hash, password)
+
+
+@lru_cache(maxsize=None)
+def _current_method() -> str:
+    """
+    werkzeug 在哈希中写入的是补全参数后的算法串（如 scrypt -> scrypt:32768:8:1），
+    与 PASSWORD_HASH_METHOD 字面值未必相同；每个进程首次调用时生成一个哈希取其前缀。
+    """
+    return generate_password_hash("", PASSWORD_HASH_METHOD, 1).split("$", 1)[0]
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """已存哈希的算法/参数或盐长度与当前配置不一致时返回 True（登录成功后可透明升级）。"""
+    parts = (password_hash or "").split("$", 2)
+    if len(parts) != 3:
+        return True
+    method, salt, _ = parts
+    return method != _current_method() or len(salt) != PASSWORD_HASH_SALT_LENGTH
 
 
 def encode_token(user_id: int, username: str, is_admin: bool = False) -> str:
@@ -28,9 +118,69 @@ def encode_token(user_id: int, username: str, is_admin: bool = False) -> str:
     return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
 
 
+class _TokenCache:
+    """
+    已校验令牌 -> claims 的定长 LRU。条目在令牌的 exp 时刻失效，不会比令牌本身活得更久；
+    只缓存校验成功的令牌，非法令牌每次都走完整校验。
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = max(0, maxsize)
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # token -> (exp, claims)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._data.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            exp, claims = entry
+            if time.time() >= exp:
+                del self._data[token]
+                self.misses += 1
+                return None
+            self._data.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def set(self, token: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        # 无 exp 或带 nbf（尚未生效）的令牌不缓存，保持每次完整校验
+        if not self.maxsize or not isinstance(exp, (int, float)) or "nbf" in claims:
+            return
+        with self._lock:
+            self._data[token] = (exp, claims)
+            self._data.move_to_end(token)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+_token_cache = _TokenCache(JWT_CACHE_SIZE)
+
+
 def decode_token(token: str) -> Optional[dict]:
-    """解码并校验 JWT（含签名与过期时间 exp）；过期或非法返回 None。"""
+    """解码并校验 JWT（含签名与过期时间 exp）；过期或非法返回 None。重复令牌命中缓存，跳过 HMAC 与 JSON 解析。"""
+    claims = _token_cache.get(token)
+    if claims is not None:
+        return dict(claims)
     try:
-        return jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+        claims = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
     except jwt.InvalidTokenError:
         return None
+    _token_cache.set(token, claims)
+    return dict(claims)
+
+
+def token_cache_stats() -> dict:
+    return _token_cache.stats()
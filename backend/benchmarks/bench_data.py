@@ -0,0 +1,81 @@
+"""
+基准测试的数据准备：
+- seed()：向当前配置的数据库（临时 SQLite 或本地 MySQL）写入基准用户、计算日志与公告，已写过则跳过。
+需在 sys.path 包含 backend 目录、且环境变量（SQLITE_PATH 等）设置完毕后导入。
+"""
+import time
+
+BENCH_USER = "bench_user"
+BENCH_PASSWORD = "bench-password"
+USER_PREFIX = "bench_u"
+
+
+def seed(users: int, logs: int, announcements: int = 5) -> dict:
+    """写入基准数据并校准统计计数器，返回各表实际写入条数。"""
+    from app import app
+    from auth_utils import hash_password
+    from config import IS_PRODUCTION
+    from db import get_connection, cursor, init_db
+    import result_store
+    import stat_counters
+    import user_search
+
+    init_db()
+    written = {"users": 0, "calculate_logs": 0, "announcements": 0}
+    conn = get_connection()
+    try:
+        with cursor(conn) as cur:
+            # 前缀中的 "_" 是 LIKE 通配符需转义；BENCH_USER 本身也以该前缀开头，单独排除
+            like = USER_PREFIX.replace("_", "\\_") + "%"
+            cur.execute(
+                "SELECT COUNT(*) AS c FROM users WHERE username LIKE %s"
+                + ("" if IS_PRODUCTION else " ESCAPE '\\'") + " AND username <> %s",
+                (like, BENCH_USER),
+            )
+            existing = cur.fetchone()["c"]
+        if existing >= users:
+            return written
+
+        # 可登录的基准账号走正常注册流程（真实密码哈希）
+        app.test_client().post("/api/auth/register", json={"username": BENCH_USER, "password": BENCH_PASSWORD})
+        # 批量用户共用同一个哈希，只用于列表与搜索
+        shared_hash = hash_password(BENCH_PASSWORD)
+        with cursor(conn) as cur:
+            for start in range(existing, users, 1000):
+                names = [f"{USER_PREFIX}{i:07d}" for i in range(start, min(users, start + 1000))]
+                for name in names:
+                    cur.execute("INSERT INTO users (username, password_hash) VALUES (%s, %s)", (name, shared_hash))
+                    user_search.index_user(cur, cur.lastrowid, name)
+                written["users"] += len(names)
+        conn.commit()
+
+        # 计算日志：少量不同结果（与真实流量相似，结果按内容去重），created_at 取当前时间以落入现有分区
+        results = []
+        for k in range(20):
+            fields = {"petMonths": k, "deathDate": f"2024-01-{k + 1:02d}", "suggestedQuantity": 9,
+                      "burningDates": [], "explanation": f"bench {k}"}
+            results.append(result_store.digest(fields))
+        with cursor(conn) as cur:
+            result_store.store(cur, [(h, text, time.strftime("%Y-%m-%d")) for h, text in results])
+            for start in range(0, logs, 1000):
+                rows = [
+                    (None, f"pet{i}", f"2024-01-{i % 20 + 1:02d}", "zh" if i % 2 else "en", results[i % 20][0])
+                    for i in range(start, min(logs, start + 1000))
+                ]
+                cur.executemany(
+                    "INSERT INTO calculate_logs (user_id, pet_name, death_date, locale, result_hash) "
+                    "VALUES (%s, %s, %s, %s, %s)",
+                    rows,
+                )
+                written["calculate_logs"] += len(rows)
+            for i in range(announcements):
+                cur.execute(
+                    "INSERT INTO announcements (title, body, locale) VALUES (%s, %s, %s)",
+                    (f"bench {i}", "基准测试公告" * 20, "zh" if i % 2 else "en"),
+                )
+                written["announcements"] += 1
+        conn.commit()
+        stat_counters.reconcile(conn)
+        return written
+    finally:
+        conn.close()
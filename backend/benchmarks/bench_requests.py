@@ -0,0 +1,346 @@
+"""
+请求路径基准：覆盖 /api/calculate（zh、en）、/api/language-strings、/api/announcements、/api/auth/login 与管理端列表接口。
+两种运行方式：
+- client：进程内 Flask test client 顺序请求，只测应用代码本身；
+- gunicorn：启动真实 gunicorn（--workers 个 worker），用本地多线程 HTTP 负载生成器（--concurrency 个连接）压测。
+calculate 按 locale 渲染本地模板，请求路径上不调用远程翻译：calculate_en 测的是英文模板渲染，不含翻译耗时。
+默认在临时 SQLite 中写入基准数据；--use-env-db 则使用 .env 中的数据库（如本地 MySQL），基准数据已存在时不重复写入。
+结果为 JSON（每个场景的 p50/p95/p99/平均延迟毫秒、req/s、错误数），可用 --baseline 与保存的结果比较：
+p95 变慢或 req/s 下降超过 --threshold（百分比）时退出码为 1。
+用法:
+    cd backend && python benchmarks/bench_requests.py --output bench.json
+    python benchmarks/bench_requests.py --server gunicorn --workers 4 --concurrency 16 --baseline bench.json
+"""
+import argparse
+import http.client
+import itertools
+import json
+import math
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+# (method, path, json 请求体, 额外请求头)
+Request = Tuple[str, str, Optional[dict], Dict[str, str]]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩百分位（sorted_values 已升序）。"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(sum(values) / count * 1000, 3) if count else 0.0,
+        "rps": round(count / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def build_scenarios(admin_token: str, user_password: str) -> Dict[str, Tuple[Callable[[int], Request], float]]:
+    """场景名 -> (第 i 个请求的构造函数, 请求数倍率)。登录含真实密码哈希，请求数按倍率缩减。"""
+    from bench_data import BENCH_USER, USER_PREFIX
+
+    today = date.today()
+    death_dates = [(today - timedelta(days=30 + 7 * k)).isoformat() for k in range(200)]
+    admin = {"Authorization": f"Bearer {admin_token}"}
+
+    def calculate(locale: str) -> Callable[[int], Request]:
+        return lambda i: ("POST", "/api/calculate",
+                          {"deathDate": death_dates[i % len(death_dates)], "petName": f"pet{i}", "locale": locale}, {})
+
+    return {
+        "calculate_zh": (calculate("zh"), 1.0),
+        "calculate_en": (calculate("en"), 1.0),
+        "language_strings": (lambda i: ("GET", f"/api/language-strings?locale={'zh' if i % 2 else 'en'}", None, {}), 1.0),
+        "announcements": (lambda i: ("GET", f"/api/announcements?locale={'zh' if i % 2 else 'en'}", None, {}), 1.0),
+        "auth_login": (lambda i: ("POST", "/api/auth/login", {"username": BENCH_USER, "password": user_password}, {}), 0.05),
+        "admin_users": (lambda i: ("GET", "/api/admin/users?per_page=20", None, admin), 0.5),
+        "admin_users_search": (lambda i: ("GET", f"/api/admin/users?per_page=20&search={USER_PREFIX}{i % 1000:04d}", None, admin), 0.5),
+        "admin_calculate_logs": (lambda i: ("GET", "/api/admin/calculate-logs?per_page=20", None, admin), 0.5),
+    }
+
+
+def run_client(scenarios, requests: int, warmup: int) -> Dict[str, dict]:
+    """进程内 test client，顺序执行。"""
+    from app import app
+
+    client = app.test_client()
+    results = {}
+    for name, (make, weight) in scenarios.items():
+        n = max(5, int(requests * weight))
+        for i in range(min(warmup, n)):
+            method, path, body, headers = make(i)
+            client.open(path, method=method, json=body, headers=headers)
+        latencies, errors = [], 0
+        started = time.perf_counter()
+        for i in range(n):
+            method, path, body, headers = make(i)
+            t0 = time.perf_counter()
+            resp = client.open(path, method=method, json=body, headers=headers)
+            resp.get_data()
+            latencies.append(time.perf_counter() - t0)
+            if resp.status_code >= 400:
+                errors += 1
+        results[name] = summarize(latencies, errors, time.perf_counter() - started)
+        print(f"{name:22s} {results[name]}", file=sys.stderr)
+    return results
+
+
+class _HttpWorker:
+    """负载生成线程的持久连接；服务端要求关闭时（gunicorn sync worker 不支持 keep-alive）重新连接。"""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.conn: Optional[http.client.HTTPConnection] = None
+
+    def request(self, method: str, path: str, body: Optional[dict], headers: Dict[str, str]) -> int:
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        payload = None
+        headers = dict(headers)
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            resp = self.conn.getresponse()
+            resp.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if resp.will_close:
+            self.close()
+        return resp.status
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def run_http(scenarios, requests: int, warmup: int, concurrency: int, host: str, port: int) -> Dict[str, dict]:
+    """concurrency 个线程共享请求计数，直到每个场景发完 n 个请求。"""
+    results = {}
+    for name, (make, weight) in scenarios.items():
+        n = max(5, int(requests * weight))
+        warm = _HttpWorker(host, port)
+        for i in range(min(warmup, n)):
+            warm.request(*make(i))
+        warm.close()
+
+        counter = itertools.count()
+        lock = threading.Lock()
+        latencies: List[float] = []
+        errors = [0]
+
+        def worker():
+            client = _HttpWorker(host, port)
+            local, failed = [], 0
+            while True:
+                with lock:
+                    i = next(counter)
+                if i >= n:
+                    break
+                t0 = time.perf_counter()
+                try:
+                    status = client.request(*make(i))
+                except (OSError, http.client.HTTPException):
+                    status = 599
+                local.append(time.perf_counter() - t0)
+                if status >= 400:
+                    failed += 1
+            client.close()
+            with lock:
+                latencies.extend(local)
+                errors[0] += failed
+
+        threads = [threading.Thread(target=worker) for _ in range(max(1, concurrency))]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        results[name] = summarize(latencies, errors[0], time.perf_counter() - started)
+        print(f"{name:22s} {results[name]}", file=sys.stderr)
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(workers: int, port: int, env: dict) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--workers", str(workers), "--bind", f"127.0.0.1:{port}",
+         "--pythonpath", BACKEND_DIR, "--log-level", "warning", "app:app"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("gunicorn did not become ready within 30s")
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """逐场景对比，打印变化百分比；返回超出阈值的回退项。"""
+    regressions = []
+    keys = ("server", "workers", "concurrency", "database")
+    differs = [k for k in keys if current["meta"].get(k) != baseline.get("meta", {}).get(k)]
+    if differs:
+        print(f"warning: baseline was run with different settings: {', '.join(differs)}", file=sys.stderr)
+    print(f"{'scenario':22s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'req/s':>9s}", file=sys.stderr)
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            print(f"{name:22s} (no baseline)", file=sys.stderr)
+            continue
+
+        def delta(key: str) -> float:
+            return (cur[key] - base[key]) / base[key] * 100 if base[key] else 0.0
+
+        print(f"{name:22s} {delta('p50_ms'):+8.1f}% {delta('p95_ms'):+8.1f}% {delta('p99_ms'):+8.1f}% {delta('rps'):+8.1f}%", file=sys.stderr)
+        if delta("p95_ms") > threshold:
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {cur['p95_ms']}ms")
+        if delta("rps") < -threshold:
+            regressions.append(f"{name}: req/s {base['rps']} -> {cur['rps']}")
+    return regressions
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=("client", "gunicorn"), default="client")
+    parser.add_argument("--requests", type=int, default=500, help="每个场景的请求数（登录、管理端按倍率缩减）")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8, help="gunicorn 模式的并发连接数")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker 数")
+    parser.add_argument("--users", type=int, default=20000, help="写入的基准用户数")
+    parser.add_argument("--logs", type=int, default=50000, help="写入的计算日志条数")
+    parser.add_argument("--use-env-db", action="store_true", help="使用 .env 配置的数据库而非临时 SQLite")
+    parser.add_argument("--scenarios", help="只运行这些场景（逗号分隔）")
+    parser.add_argument("--output", help="结果 JSON 写入文件（默认输出到 stdout）")
+    parser.add_argument("--baseline", help="与之比较的结果 JSON")
+    parser.add_argument("--threshold", type=float, default=20.0, help="判定回退的变化百分比")
+    args = parser.parse_args()
+
+    tmpdir = None
+    if not args.use_env_db:
+        tmpdir = tempfile.TemporaryDirectory(prefix="bench-")
+        os.environ["SQLITE_PATH"] = os.path.join(tmpdir.name, "bench.db")
+        os.environ["CALCULATE_LOG_ARCHIVE_DIR"] = os.path.join(tmpdir.name, "archive")
+        os.environ["METRICS_DIR"] = os.path.join(tmpdir.name, "metrics")
+
+    from bench_data import BENCH_PASSWORD, seed
+
+    t0 = time.perf_counter()
+    seeded = seed(args.users, args.logs)
+    print(f"seeded {seeded} in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    from app import app
+
+    admin_token = app.test_client().post(
+        "/api/admin/login", json={"username": "admin", "password": "admin"}
+    ).get_json()["token"]
+    scenarios = build_scenarios(admin_token, BENCH_PASSWORD)
+    if args.scenarios:
+        wanted = set(args.scenarios.split(","))
+        scenarios = {k: v for k, v in scenarios.items() if k in wanted}
+
+    proc = None
+    try:
+        if args.server == "client":
+            results = run_client(scenarios, args.requests, args.warmup)
+        else:
+            port = _free_port()
+            proc = start_gunicorn(args.workers, port, dict(os.environ))
+            results = run_http(scenarios, args.requests, args.warmup, args.concurrency, "127.0.0.1", port)
+    finally:
+        if proc is not None:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=30)
+        # 先写完本进程 calculate 日志队列中的条目，再删除临时数据库
+        from log_writer import calculate_log_writer
+
+        calculate_log_writer.close()
+        log_writer_stats = calculate_log_writer.stats()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    report = {
+        "meta": {
+            "server": args.server,
+            "workers": args.workers if args.server == "gunicorn" else None,
+            "concurrency": args.concurrency if args.server == "gunicorn" else 1,
+            "requests": args.requests,
+            "users": args.users,
+            "logs": args.logs,
+            "database": "env" if args.use_env_db else "sqlite-temp",
+            # client 模式下 calculate 日志由本进程异步写入；gunicorn 模式写在各 worker 中，此处不计
+            "log_writer": log_writer_stats if args.server == "client" else None,
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print("regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
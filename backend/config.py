@@ -17,9 +17,81 @@ MYSQL_USER = os.getenv("MYSQL_USER", "root")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "")
 MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "pet_eternal_flame")
 
+# MySQL 连接池（每个 gunicorn worker 一份）：常驻连接数、高峰额外连接数、等待超时与空闲回收（秒）
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") not in ("0", "false", "False", "")
+
 # SQLite（development 默认，无需安装 MySQL）
 _dir = Path(__file__).resolve().parent
 SQLITE_PATH = os.getenv("SQLITE_PATH", str(_dir / "data" / "dev.db"))
+# SQLite 高并发模式：WAL、synchronous=NORMAL、mmap 与页缓存、busy_timeout，并按线程复用连接（每线程最多保留 IDLE 个空闲连接）；
+# SQLITE_TUNED=0 时恢复为每次请求新建连接、默认日志模式
+SQLITE_TUNED = os.getenv("SQLITE_TUNED", "1") not in ("0", "false", "False", "")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+SQLITE_THREAD_IDLE = int(os.getenv("SQLITE_THREAD_IDLE", "2"))
 
 JWT_SECRET = os.getenv("JWT_SECRET", "change-me-in-production")
 JWT_EXPIRE_HOURS = int(os.getenv("JWT_EXPIRE_HOURS", "168"))
+# 密码哈希：werkzeug 格式的算法与参数（如 pbkdf2:sha256:1000000、scrypt:32768:8:1），
+# 已存哈希与此不同时会在用户下次登录成功后自动升级
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000000")
+PASSWORD_HASH_SALT_LENGTH = int(os.getenv("PASSWORD_HASH_SALT_LENGTH", "16"))
+# 哈希线程池：每个 worker 的线程数、最多排队任务数、单次等待超时（秒），超出即返回 503。
+# 需配合 gthread 等多线程 worker（见 scripts/deploy/pet-eternal-flame.service）：sync worker 同时只处理一个请求，线程池起不到隔离作用
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16"))
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+# 已校验 JWT 的进程内缓存条数（条目在令牌 exp 时失效）
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+
+# calculate_logs 异步批量写入：队列容量、每批条数、最长攒批秒数；
+# 队列满时策略 drop（直接丢弃）或 block（最多等待 PUT_TIMEOUT 秒后丢弃）
+CALCULATE_LOG_QUEUE_SIZE = int(os.getenv("CALCULATE_LOG_QUEUE_SIZE", "10000"))
+CALCULATE_LOG_BATCH_SIZE = int(os.getenv("CALCULATE_LOG_BATCH_SIZE", "200"))
+CALCULATE_LOG_FLUSH_INTERVAL = float(os.getenv("CALCULATE_LOG_FLUSH_INTERVAL", "1.0"))
+CALCULATE_LOG_OVERFLOW_POLICY = os.getenv("CALCULATE_LOG_OVERFLOW_POLICY", "drop")
+CALCULATE_LOG_PUT_TIMEOUT = float(os.getenv("CALCULATE_LOG_PUT_TIMEOUT", "0.05"))
+
+# 进程内缓存（多语言包等）检查 cache_versions 版本号的间隔（秒），即其他 worker 写入后的最长生效延迟
+CACHE_VERSION_POLL_INTERVAL = float(os.getenv("CACHE_VERSION_POLL_INTERVAL", "2"))
+
+# 公共接口（多语言包、公告）的 Cache-Control max-age（秒）；过期后浏览器/nginx 携带 ETag 回源校验
+PUBLIC_CACHE_MAX_AGE = int(os.getenv("PUBLIC_CACHE_MAX_AGE", "5"))
+
+# /api/calculate 结果缓存条数（按天作用域，午夜清空）
+CALCULATE_CACHE_SIZE = int(os.getenv("CALCULATE_CACHE_SIZE", "4096"))
+
+# /api/calculate/batch 单次请求的最大条目数
+CALCULATE_BATCH_MAX_ITEMS = int(os.getenv("CALCULATE_BATCH_MAX_ITEMS", "20000"))
+
+# 翻译缓存：进程内 LRU 条数（另有数据库 translation_cache 表持久化）
+TRANSLATE_CACHE_SIZE = int(os.getenv("TRANSLATE_CACHE_SIZE", "2048"))
+# 翻译并发线程数与单次调用（多段并发）的总时限（秒）；超时的段回退缓存译文或原文
+TRANSLATE_MAX_WORKERS = int(os.getenv("TRANSLATE_MAX_WORKERS", "4"))
+TRANSLATE_DEADLINE = float(os.getenv("TRANSLATE_DEADLINE", "5"))
+
+# 管理端列表 total=approx 时 COUNT(*) 结果的缓存秒数
+PAGINATION_COUNT_TTL = float(os.getenv("PAGINATION_COUNT_TTL", "30"))
+
+# 请求/阶段耗时指标（/api/admin/metrics）：开关、各 worker 快照目录（合并后即全部 worker 之和）、快照写入间隔（秒）；
+# METRICS_TOKEN 非空时 Prometheus 可用 Authorization: Bearer <METRICS_TOKEN> 抓取，无需管理员登录
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") not in ("0", "false", "False", "")
+METRICS_DIR = os.getenv("METRICS_DIR", str(_dir / "data" / "metrics"))
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# SQL 指纹统计（/api/admin/slow-queries）：开关、每个 worker 最多跟踪的指纹数；
+# 单条语句耗时达到 SLOW_QUERY_MS（毫秒，0 关闭）时写慢查询日志（参数只记类型与长度）
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "1") not in ("0", "false", "False", "")
+QUERY_STATS_MAX_FINGERPRINTS = int(os.getenv("QUERY_STATS_MAX_FINGERPRINTS", "500"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+# calculate_logs 保留期（月，含当月；0 表示不删除）、预建分区月数、归档目录（gzip NDJSON）
+CALCULATE_LOG_RETENTION_MONTHS = int(os.getenv("CALCULATE_LOG_RETENTION_MONTHS", "12"))
+CALCULATE_LOG_PARTITIONS_AHEAD = int(os.getenv("CALCULATE_LOG_PARTITIONS_AHEAD", "2"))
+CALCULATE_LOG_ARCHIVE_DIR = os.getenv("CALCULATE_LOG_ARCHIVE_DIR", str(_dir / "data" / "archive"))
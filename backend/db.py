@@ -2,6 +2,9 @@
 import os
 import json
 import sqlite3
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
 
 from config import (
@@ -12,33 +15,341 @@ from config import (
     MYSQL_PASSWORD,
     MYSQL_DATABASE,
     SQLITE_PATH,
+    SQLITE_TUNED,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_MMAP_SIZE,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_THREAD_IDLE,
+    DB_POOL_SIZE,
+    DB_POOL_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_IDLE_TIMEOUT,
+    DB_POOL_PRE_PING,
 )
+import metrics
+import query_stats
 
 if IS_PRODUCTION:
     import pymysql
-    from pymysql.cursors import DictCursor
+    from pymysql.cursors import DictCursor, SSDictCursor
+
+
+class _SqliteConnection(sqlite3.Connection):
+    """记录创建连接的线程：sqlite3 连接只能在该线程使用，按线程复用时据此判断能否归还。"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.owner_thread = threading.get_ident()
 
 
 def _sqlite_connection():
     os.makedirs(os.path.dirname(SQLITE_PATH) or ".", exist_ok=True)
-    conn = sqlite3.connect(SQLITE_PATH)
+    conn = sqlite3.connect(SQLITE_PATH, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000.0, factory=_SqliteConnection)
     conn.row_factory = sqlite3.Row  # 使 row["col"] 可用
+    if SQLITE_TUNED:
+        # WAL：读不阻塞写、写不阻塞读（日志模式写入数据库文件，只需设置一次，重复执行无副作用）；
+        # WAL 下 synchronous=NORMAL 仍保证数据库一致，只在断电时可能丢失最后几个事务
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}")
+        conn.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)}")
+        conn.execute(f"PRAGMA cache_size=-{int(SQLITE_CACHE_SIZE_KB)}")
     return conn
 
 
+def _mysql_connection():
+    return pymysql.connect(
+        host=MYSQL_HOST,
+        port=MYSQL_PORT,
+        user=MYSQL_USER,
+        password=MYSQL_PASSWORD,
+        database=MYSQL_DATABASE,
+        charset="utf8mb4",
+        cursorclass=DictCursor,
+    )
+
+
+class _PooledConnection:
+    """连接池借出的连接代理：其余属性透传给真实连接，close() 改为归还连接池。"""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get("_raw")
+        if raw is None:
+            raise AttributeError(name)
+        return getattr(raw, name)
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool.release(raw)
+
+    def invalidate(self):
+        """连接已损坏时调用：直接关闭而不放回池中。"""
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool.release(raw, discard=True)
+
+
+class _ConnectionPool:
+    """
+    MySQL 连接池（每个 gunicorn worker 进程一份）。
+    - size：常驻空闲连接上限；max_overflow：高峰期可额外创建、归还时即关闭的连接数
+    - timeout：池满时等待可用连接的秒数，超时抛 OperationalError（接口返回 503）
+    - idle_timeout：空闲超过该秒数的连接丢弃重建，避免被 MySQL wait_timeout 断开
+    - pre_ping：借出前 ping 一次，失效则重建
+    """
+
+    def __init__(self, creator, size, max_overflow, timeout, idle_timeout, pre_ping):
+        self._creator = creator
+        self.size = max(1, size)
+        self.max_overflow = max(0, max_overflow)
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.pre_ping = pre_ping
+        self.pid = os.getpid()
+        self._idle = deque()  # (raw_conn, last_used_monotonic)
+        self._cond = threading.Condition()
+        self._checked_out = 0
+        # 统计，用于调整 size/overflow
+        self._checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._connects = 0
+        self._discards = 0
+
+    def acquire(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        raw = last_used = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    raw, last_used = self._idle.pop()
+                    break
+                if self._checked_out < self.size + self.max_overflow:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise pymysql.err.OperationalError(
+                        2013, f"connection pool exhausted (timeout {self.timeout}s)"
+                    )
+                self._cond.wait(remaining)
+            self._checked_out += 1
+            waited = time.monotonic() - start
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        try:
+            if raw is not None and self.idle_timeout and time.monotonic() - last_used > self.idle_timeout:
+                self._close_quietly(raw)
+                raw = None
+            if raw is not None and self.pre_ping:
+                try:
+                    raw.ping(reconnect=False)
+                except Exception:
+                    self._close_quietly(raw)
+                    raw = None
+            if raw is None:
+                raw = self._creator()
+                with self._cond:
+                    self._connects += 1
+        except Exception:
+            with self._cond:
+                self._checked_out -= 1
+                self._cond.notify()
+            raise
+        return _PooledConnection(self, raw)
+
+    def release(self, raw, discard=False):
+        if os.getpid() != self.pid:
+            # fork 前借出的连接：不在子进程内复用，也不发送 COM_QUIT 影响父进程
+            return
+        if not discard:
+            try:
+                # 清理未提交事务，保证下一个借用者拿到干净连接
+                raw.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            self._checked_out -= 1
+            if not discard and len(self._idle) < self.size:
+                self._idle.append((raw, time.monotonic()))
+                raw = None
+            self._cond.notify()
+        if raw is not None:
+            self._close_quietly(raw)
+
+    def _close_quietly(self, raw):
+        with self._cond:
+            self._discards += 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                "pid": self.pid,
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "idle": len(self._idle),
+                "checked_out": self._checked_out,
+                "checkouts": checkouts,
+                "connects": self._connects,
+                "discards": self._discards,
+                "timeouts": self._timeouts,
+                "wait_avg_ms": round(self._wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+                "wait_total_ms": round(self._wait_total * 1000, 3),
+            }
+
+
+class _SqliteThreadConnections:
+    """
+    SQLite 按线程复用连接：每个线程保留至多 idle 个空闲连接，close() 时回滚未提交事务后放回本线程。
+    同一线程内嵌套借用（如请求处理中读取缓存版本号）拿到不同连接，事务互不影响。
+    sqlite3 连接只能在创建它的线程使用；在其他线程（或 fork 后）归还的连接不再复用。
+    """
+
+    def __init__(self, creator, idle: int):
+        self._creator = creator
+        self.idle = max(0, idle)
+        self.pid = os.getpid()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._connects = 0
+        self._discards = 0
+
+    def _idle_list(self) -> list:
+        idle = getattr(self._local, "idle", None)
+        if idle is None:
+            idle = self._local.idle = []
+        return idle
+
+    def acquire(self):
+        idle = self._idle_list()
+        if idle:
+            raw = idle.pop()
+        else:
+            raw = self._creator()
+            with self._lock:
+                self._connects += 1
+        with self._lock:
+            self._checkouts += 1
+        return _PooledConnection(self, raw)
+
+    def release(self, raw, discard=False):
+        if os.getpid() != self.pid or raw.owner_thread != threading.get_ident():
+            # 不能在当前线程操作该连接，交给垃圾回收
+            with self._lock:
+                self._discards += 1
+            return
+        if not discard and raw.in_transaction:
+            try:
+                # 清理未提交事务，保证下一个借用者拿到干净连接
+                raw.rollback()
+            except Exception:
+                discard = True
+        idle = self._idle_list()
+        if not discard and len(idle) < self.idle:
+            idle.append(raw)
+            return
+        with self._lock:
+            self._discards += 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pid": self.pid,
+                "thread_idle": self.idle,
+                "checkouts": self._checkouts,
+                "connects": self._connects,
+                "discards": self._discards,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _reset_pool_after_fork():
+    """gunicorn fork 出 worker 后丢弃从父进程继承的连接池，由子进程按需重建。"""
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+
+def _get_pool():
+    global _pool
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = _ConnectionPool(
+                _mysql_connection,
+                size=DB_POOL_SIZE,
+                max_overflow=DB_POOL_MAX_OVERFLOW,
+                timeout=DB_POOL_TIMEOUT,
+                idle_timeout=DB_POOL_IDLE_TIMEOUT,
+                pre_ping=DB_POOL_PRE_PING,
+            )
+        return _pool
+
+
+def _get_sqlite_connections():
+    global _pool
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = _SqliteThreadConnections(_sqlite_connection, idle=SQLITE_THREAD_IDLE)
+        return _pool
+
+
 def get_connection():
-    """返回数据库连接。开发环境为 SQLite，生产为 MySQL。"""
-    if IS_PRODUCTION:
-        return pymysql.connect(
-            host=MYSQL_HOST,
-            port=MYSQL_PORT,
-            user=MYSQL_USER,
-            password=MYSQL_PASSWORD,
-            database=MYSQL_DATABASE,
-            charset="utf8mb4",
-            cursorclass=DictCursor,
-        )
-    return _sqlite_connection()
+    """
+    返回数据库连接。开发环境为 SQLite，生产为 MySQL（从连接池借出）。
+    调用方照常 conn.close()：池化连接的 close() 会归还连接池而不是断开。
+    """
+    with metrics.span("db_connect"):
+        if IS_PRODUCTION:
+            return _get_pool().acquire()
+        if SQLITE_TUNED:
+            return _get_sqlite_connections().acquire()
+        return _sqlite_connection()
+
+
+def pool_stats() -> dict:
+    """当前 worker 进程的连接池统计（等待时间、借出次数等）；SQLite 高并发模式为按线程复用的借出/新建次数。"""
+    if not IS_PRODUCTION:
+        if not SQLITE_TUNED:
+            return {"backend": "sqlite"}
+        stats = _get_sqlite_connections().stats()
+        stats["backend"] = "sqlite"
+        return stats
+    stats = _get_pool().stats()
+    stats["backend"] = "mysql"
+    return stats
 
 
 class _SqliteCursorAdapter:
@@ -48,6 +359,7 @@ class _SqliteCursorAdapter:
         self._conn = conn
         self._cursor = conn.cursor()
         self.lastrowid = None
+        self.rowcount = -1
 
     def execute(self, sql, args=None):
         if args is None:
@@ -55,6 +367,13 @@ class _SqliteCursorAdapter:
         sql = sql.replace("%s", "?")
         self._cursor.execute(sql, args)
         self.lastrowid = self._cursor.lastrowid
+        self.rowcount = self._cursor.rowcount
+        return self._cursor
+
+    def executemany(self, sql, seq_of_args):
+        sql = sql.replace("%s", "?")
+        self._cursor.executemany(sql, seq_of_args)
+        self.rowcount = self._cursor.rowcount
         return self._cursor
 
     def fetchone(self):
@@ -67,6 +386,9 @@ class _SqliteCursorAdapter:
         rows = self._cursor.fetchall()
         return [dict(row) for row in rows]
 
+    def fetchmany(self, size):
+        return [dict(row) for row in self._cursor.fetchmany(size)]
+
     def __enter__(self):
         return self
 
@@ -74,17 +396,74 @@ class _SqliteCursorAdapter:
         self._cursor.close()
 
 
+class _TimedCursor:
+    """
+    游标代理：execute / executemany 计入 db_query 阶段耗时与 SQL 指纹统计（慢查询日志），
+    其余属性（fetch*、lastrowid、rowcount）透传。
+    """
+
+    __slots__ = ("_cur",)
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+    def execute(self, sql, args=None):
+        started = time.perf_counter()
+        try:
+            return self._cur.execute(sql, args)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.observe_stage("db_query", elapsed)
+            query_stats.record(sql, args, elapsed)
+
+    def executemany(self, sql, seq_of_args):
+        started = time.perf_counter()
+        try:
+            return self._cur.executemany(sql, seq_of_args)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.observe_stage("db_query", elapsed)
+            query_stats.record(sql, seq_of_args, elapsed, many=True)
+
+
 @contextmanager
 def cursor(conn):
     """统一 cursor 接口：with cursor(conn) as cur: cur.execute(...); cur.fetchone(); cur.lastrowid"""
     if IS_PRODUCTION:
         with conn.cursor() as cur:
-            yield cur
+            yield _TimedCursor(cur)
         return
     # SQLite: 包装成支持 %s 和 dict 行
     adapter = _SqliteCursorAdapter(conn)
     try:
-        yield adapter
+        yield _TimedCursor(adapter)
+    finally:
+        adapter._cursor.close()
+
+
+@contextmanager
+def streaming_cursor(conn):
+    """
+    服务端游标，用于逐批读取大结果集（cur.fetchmany(n)），内存占用与结果集大小无关。
+    MySQL 为无缓冲的 SSDictCursor：结果读完前该连接不能执行其他语句；中途异常或放弃
+    （如客户端断开导致生成器关闭）时直接丢弃连接，而不是关闭游标时把剩余结果读完。
+    SQLite 游标本身即按需步进。
+    """
+    if IS_PRODUCTION:
+        cur = conn.cursor(SSDictCursor)
+        try:
+            yield _TimedCursor(cur)
+        except BaseException:
+            conn.invalidate()
+            raise
+        cur.close()
+        return
+    adapter = _SqliteCursorAdapter(conn)
+    try:
+        yield _TimedCursor(adapter)
     finally:
         adapter._cursor.close()
 
@@ -95,6 +474,17 @@ def init_db():
         _init_mysql()
     else:
         _init_sqlite()
+    # 基础表就绪后执行版本化迁移（索引等），见 migrations.py
+    from migrations import migrate
+    from retention import ensure_partitions
+
+    migrate()
+    # 预建未来几个月的 calculate_logs 分区（保留期清理由 scripts/retention.sh 定时执行）
+    conn = get_connection()
+    try:
+        ensure_partitions(conn)
+    finally:
+        conn.close()
 
 
 def _project_root() -> str:
@@ -173,6 +563,20 @@ def _seed_language_strings(conn):
         conn.rollback()
 
 
+def _seed_stat_counters(conn):
+    """stat_counters 为空（新建或升级前的库）时按现有数据校准一次。"""
+    from stat_counters import reconcile
+
+    try:
+        with cursor(conn) as cur:
+            cur.execute("SELECT COUNT(*) AS cnt FROM stat_counters")
+            count = cur.fetchone()["cnt"]
+        if not count:
+            reconcile(conn)
+    except Exception:
+        conn.rollback()
+
+
 def _init_sqlite():
     conn = _sqlite_connection()
     try:
@@ -215,6 +619,7 @@ def _init_sqlite():
                 death_date TEXT NOT NULL,
                 locale TEXT NOT NULL DEFAULT 'zh',
                 result_json TEXT,
+                result_hash TEXT,
                 created_at TEXT DEFAULT (datetime('now'))
             )
         """)
@@ -240,6 +645,40 @@ def _init_sqlite():
                 updated_at TEXT DEFAULT (datetime('now'))
             )
         """)
+        # 翻译缓存（原文 sha256 + 目标语言 -> 译文），供 translate_zh_en 跨进程复用
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS translation_cache (
+                source_hash TEXT NOT NULL,
+                target_lang TEXT NOT NULL,
+                source_text TEXT NOT NULL,
+                translated TEXT NOT NULL,
+                created_at TEXT DEFAULT (datetime('now')),
+                PRIMARY KEY (source_hash, target_lang)
+            )
+        """)
+        # 进程内缓存的版本号，写接口递增后各 worker 轮询发现并重建缓存
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_versions (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        # 运营统计计数器（总用户数、总计算次数、每日计算次数），见 stat_counters.py
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS stat_counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        # calculate_logs 的结果本体按内容去重存储，日志行只记 result_hash，见 result_store.py
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS calculate_results (
+                hash TEXT PRIMARY KEY,
+                result_json TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_calculate_results_last_seen ON calculate_results (last_seen)")
         conn.commit()
         # 如果没有管理员账号，创建默认 admin/admin（开发用）
         cur = conn.cursor()
@@ -257,6 +696,7 @@ def _init_sqlite():
             conn.commit()
         # 初始化 C 端多语言文案（仅在 language_strings 为空时）
         _seed_language_strings(conn)
+        _seed_stat_counters(conn)
     finally:
         conn.close()
 
@@ -317,6 +757,7 @@ def _init_mysql():
                     death_date DATE NOT NULL,
                     locale VARCHAR(16) NOT NULL DEFAULT 'zh',
                     result_json JSON,
+                    result_hash CHAR(64) CHARACTER SET ascii,
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
                 )
             """)
@@ -340,6 +781,36 @@ def _init_mysql():
                     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
                 )
             """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS translation_cache (
+                    source_hash CHAR(64) NOT NULL,
+                    target_lang VARCHAR(16) NOT NULL,
+                    source_text LONGTEXT NOT NULL,
+                    translated LONGTEXT NOT NULL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (source_hash, target_lang)
+                )
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS cache_versions (
+                    name VARCHAR(64) PRIMARY KEY,
+                    version BIGINT NOT NULL DEFAULT 0
+                )
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS stat_counters (
+                    name VARCHAR(64) PRIMARY KEY,
+                    value BIGINT NOT NULL DEFAULT 0
+                )
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS calculate_results (
+                    hash CHAR(64) CHARACTER SET ascii PRIMARY KEY,
+                    result_json JSON NOT NULL,
+                    last_seen DATE NOT NULL,
+                    INDEX idx_calculate_results_last_seen (last_seen)
+                )
+            """)
         conn.commit()
         # seed default admin if none
         with conn.cursor() as cur:
@@ -355,5 +826,6 @@ def _init_mysql():
         conn.commit()
         # 初始化 C 端多语言文案（仅在 language_strings 为空时）
         _seed_language_strings(conn)
+        _seed_stat_counters(conn)
     finally:
         conn.close()
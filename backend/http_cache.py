@@ -0,0 +1,69 @@
+"""
+公共接口的 HTTP 缓存：强 ETag、If-None-Match / If-Modified-Since 条件请求（304）与预压缩响应体。
+CachedBody 在内容（或其版本）生成时构建一次：ETag 取响应体 sha256，gzip/br 压缩结果随对象缓存复用，
+不会每个请求重复压缩。未安装 brotli 时只提供 gzip。
+"""
+import gzip
+import hashlib
+import time
+from email.utils import formatdate
+from typing import Optional
+
+from flask import Response, request
+
+from config import PUBLIC_CACHE_MAX_AGE
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 小于该字节数不压缩（压缩收益小于头部与 CPU 开销）
+MIN_COMPRESS_SIZE = 512
+
+
+class CachedBody:
+    """一份不可变的 JSON 响应体及其 ETag、Last-Modified 与预压缩版本。"""
+
+    def __init__(self, body: bytes, last_modified: Optional[float] = None, mimetype: str = "application/json"):
+        self.body = body
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.last_modified = int(last_modified if last_modified is not None else time.time())
+        self._encoded = {"identity": body}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            self._encoded["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self._encoded["br"] = brotli.compress(body)
+
+    def etag(self, encoding: str = "identity") -> str:
+        # 不同 Content-Encoding 是不同的表示，强 ETag 需区分
+        return self.digest if encoding == "identity" else f"{self.digest}-{encoding}"
+
+    def _choose_encoding(self) -> str:
+        accept = request.accept_encodings
+        for encoding in ("br", "gzip"):
+            if encoding in self._encoded and accept[encoding]:
+                return encoding
+        return "identity"
+
+    def _not_modified(self) -> bool:
+        if request.if_none_match:
+            return any(request.if_none_match.contains(self.etag(enc)) for enc in self._encoded)
+        since = request.if_modified_since
+        return since is not None and self.last_modified <= since.timestamp()
+
+    def response(self, max_age: int = PUBLIC_CACHE_MAX_AGE) -> Response:
+        """按请求的条件头与 Accept-Encoding 返回 304 或（压缩后的）200 响应。"""
+        encoding = self._choose_encoding()
+        if self._not_modified():
+            resp = Response(status=304)
+        else:
+            resp = Response(self._encoded[encoding], status=200, mimetype=self.mimetype)
+            if encoding != "identity":
+                resp.headers["Content-Encoding"] = encoding
+        resp.set_etag(self.etag(encoding))
+        resp.headers["Last-Modified"] = formatdate(self.last_modified, usegmt=True)
+        resp.headers["Cache-Control"] = f"public, max-age={max_age}, must-revalidate" if max_age > 0 else "public, no-cache"
+        resp.vary.add("Accept-Encoding")
+        return resp
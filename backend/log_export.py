@@ -0,0 +1,126 @@
+"""
+calculate_logs 流式导出（CSV / NDJSON，可选 gzip）。
+用服务端游标按批读取（db.streaming_cursor），每批格式化后立即产出，内存占用与导出行数无关；
+gzip 用 zlib 流式压缩，每批压缩后的字节直接写给客户端。
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Generator, Iterator, List, Optional, Tuple
+
+from db import get_connection, streaming_cursor
+import result_store
+
+FORMATS = ("csv", "ndjson")
+COLUMNS = ["id", "user_id", "pet_name", "death_date", "locale", "created_at"]
+FETCH_SIZE = 1000
+
+
+def parse_day(value: Optional[str]) -> Optional[date]:
+    """YYYY-MM-DD；为空返回 None，格式错误抛 ValueError。"""
+    if not value:
+        return None
+    return datetime.strptime(value.strip(), "%Y-%m-%d").date()
+
+
+def build_query(start: Optional[date], end: Optional[date], locale: Optional[str],
+                include_result: bool) -> Tuple[str, list]:
+    """按 created_at 日期区间 [start, end]（含两端）与 locale 过滤，id 升序。"""
+    where, params = [], []
+    if start:
+        where.append("l.created_at >= %s")
+        params.append(start.isoformat())
+    if end:
+        where.append("l.created_at < %s")
+        params.append((end + timedelta(days=1)).isoformat())
+    if locale:
+        where.append("l.locale = %s")
+        params.append(locale)
+    sql = f"SELECT {', '.join('l.' + c for c in COLUMNS)}"
+    if include_result:
+        # 结果按内容去重存于 calculate_results，旧行仍内联在 result_json，导出时还原为完整结果
+        sql += (
+            ", l.result_json AS legacy_json, r.result_json AS stored_json FROM calculate_logs l "
+            "LEFT JOIN calculate_results r ON r.hash = l.result_hash"
+        )
+    else:
+        sql += " FROM calculate_logs l"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql + " ORDER BY l.id", params
+
+
+def _text(value) -> str:
+    # MySQL 返回 date/datetime 对象，str() 与 SQLite 存储的文本格式一致
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return str(value)
+
+
+def _csv_chunks(rows_iter: Iterator[List[dict]], columns: List[str]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    yield buf.getvalue()
+    for rows in rows_iter:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows([_text(r[c]) for c in columns] for r in rows)
+        yield buf.getvalue()
+
+
+def _ndjson_chunks(rows_iter: Iterator[List[dict]], columns: List[str]) -> Iterator[str]:
+    for rows in rows_iter:
+        lines = []
+        for r in rows:
+            item = {c: str(r[c]) if isinstance(r[c], (date, datetime)) else r[c] for c in columns}
+            lines.append(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+        yield "\n".join(lines) + "\n"
+
+
+def _gzip(chunks: Generator[bytes, None, None]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31：gzip 头尾
+    try:
+        for chunk in chunks:
+            out = compressor.compress(chunk)
+            if out:
+                yield out
+        yield compressor.flush()
+    finally:
+        # 客户端中途断开时及时关闭内层生成器，归还连接
+        chunks.close()
+
+
+def export(fmt: str, start: Optional[date] = None, end: Optional[date] = None,
+           locale: Optional[str] = None, include_result: bool = False,
+           gzip: bool = False) -> Iterator[bytes]:
+    """生成导出内容的字节块；数据库连接在生成器内借出，结束或被关闭时归还。"""
+    sql, params = build_query(start, end, locale, include_result)
+    columns = COLUMNS + (["result_json"] if include_result else [])
+
+    def batches(cur) -> Iterator[List[dict]]:
+        cur.execute(sql, tuple(params))
+        while True:
+            rows = cur.fetchmany(FETCH_SIZE)
+            if not rows:
+                return
+            if include_result:
+                for r in rows:
+                    r["result_json"] = result_store.reconstruct(r["pet_name"], r["stored_json"], r["legacy_json"])
+            yield rows
+
+    def encoded() -> Iterator[bytes]:
+        conn = get_connection()
+        try:
+            with streaming_cursor(conn) as cur:
+                formatter = _csv_chunks if fmt == "csv" else _ndjson_chunks
+                for text in formatter(batches(cur), columns):
+                    yield text.encode("utf-8")
+        finally:
+            conn.close()
+
+    return _gzip(encoded()) if gzip else encoded()
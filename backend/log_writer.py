@@ -0,0 +1,179 @@
+"""
+calculate_logs 异步批量写入。
+请求线程只把日志条目放进有界内存队列；后台线程攒够 batch_size 条或距首条超过 flush_interval 秒时，
+用一次 executemany 多行 INSERT 写库（结果的序列化与哈希也在后台完成）。
+结果本体按内容去重存入 calculate_results，日志行只记 result_hash（见 result_store.py）；
+petName 无法由 pet_name 列还原的条目照旧内联完整 result_json。
+队列满时按 CALCULATE_LOG_OVERFLOW_POLICY 处理：drop 直接丢弃，block 最多等待 put_timeout 秒后丢弃。
+进程退出（gunicorn worker 正常退出）时通过 atexit 写完剩余条目。
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import date
+from typing import Optional
+
+import result_store
+
+from config import (
+    CALCULATE_LOG_QUEUE_SIZE,
+    CALCULATE_LOG_BATCH_SIZE,
+    CALCULATE_LOG_FLUSH_INTERVAL,
+    CALCULATE_LOG_OVERFLOW_POLICY,
+    CALCULATE_LOG_PUT_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+INSERT_SQL = (
+    "INSERT INTO calculate_logs (user_id, pet_name, death_date, locale, result_json, result_hash) "
+    "VALUES (%s, %s, %s, %s, %s, %s)"
+)
+
+
+class CalculateLogWriter:
+    def __init__(self, queue_size, batch_size, flush_interval, policy="drop", put_timeout=0.05):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.01, flush_interval)
+        self.policy = policy if policy in ("drop", "block") else "drop"
+        self.put_timeout = put_timeout
+        self._queue_size = queue_size
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stats = {"enqueued": 0, "written": 0, "dropped": 0, "batches": 0, "failures": 0, "results_written": 0}
+        self._known = None
+
+    def _ensure_started(self) -> queue.Queue:
+        # 线程不会随 fork 继承：每个 worker 进程首次写日志时各自启动
+        if self._pid == os.getpid() and self._thread is not None:
+            return self._queue
+        with self._lock:
+            if self._pid != os.getpid() or self._thread is None:
+                self._queue = queue.Queue(maxsize=self._queue_size)
+                self._known = result_store.KnownHashes()
+                self._thread = threading.Thread(target=self._run, name="calculate-log-writer", daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+            return self._queue
+
+    def submit(self, user_id, pet_name, death_date, locale, fields: dict) -> bool:
+        """放入一条日志（fields 为不含 petName 的结果本体，pet_name 为请求原值）；队列已满且策略不允许等待时丢弃并返回 False。"""
+        q = self._ensure_started()
+        entry = (user_id, pet_name, death_date, locale, fields)
+        try:
+            if self.policy == "block":
+                q.put(entry, timeout=self.put_timeout)
+            else:
+                q.put_nowait(entry)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("enqueued")
+        return True
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += n
+
+    def _run(self) -> None:
+        q = self._queue
+        batch = []
+        deadline = 0.0
+        while True:
+            timeout = self.flush_interval if not batch else max(0.0, deadline - time.monotonic())
+            try:
+                item = q.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._write(batch)
+                return
+            if item is not None:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+
+    def _write(self, batch) -> None:
+        if not batch:
+            return
+        from db import get_connection, cursor
+        import stat_counters
+
+        # 同一批里大量条目共享同一个结果对象（来自结果缓存），按对象只算一次哈希
+        digests = {}
+        rows = []
+        for user_id, pet_name, death_date, locale, fields in batch:
+            column = result_store.pet_name_column(pet_name)
+            if column != pet_name:
+                # null、非字符串或超长的 petName 拼不回原值，完整结果内联保存
+                inline = json.dumps(result_store.assemble(fields, pet_name))
+                rows.append((user_id, column, death_date, locale, inline, None))
+                continue
+            key = id(fields)
+            if key not in digests:
+                digests[key] = result_store.digest(fields)
+            rows.append((user_id, column, death_date, locale, None, digests[key][0]))
+        today = date.today()
+        new_hashes = self._known.missing((h for h, _ in digests.values()), today)
+        results = {h: text for h, text in digests.values() if h in new_hashes}
+        try:
+            conn = get_connection()
+            try:
+                with cursor(conn) as cur:
+                    result_store.store(cur, [(h, text, today) for h, text in results.items()])
+                    cur.executemany(INSERT_SQL, rows)
+                    # 与日志同一事务递增统计计数器
+                    stat_counters.increment(cur, stat_counters.CALCULATES_TOTAL, len(rows))
+                    stat_counters.increment(cur, stat_counters.calculates_day(today), len(rows))
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception:
+            # 日志仅用于统计，写库失败不重试，避免队列无限积压
+            self._count("failures")
+            self._count("dropped", len(rows))
+            logger.exception("calculate_logs 批量写入失败，丢弃 %d 条", len(rows))
+            return
+        self._known.add(results)
+        self._count("results_written", len(results))
+        self._count("batches")
+        self._count("written", len(rows))
+
+    def close(self, timeout: float = 5.0) -> None:
+        """写完队列中剩余条目并停止后台线程（atexit 调用）。"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize() if self._queue is not None and self._pid == os.getpid() else 0
+        stats["policy"] = self.policy
+        return stats
+
+
+calculate_log_writer = CalculateLogWriter(
+    queue_size=CALCULATE_LOG_QUEUE_SIZE,
+    batch_size=CALCULATE_LOG_BATCH_SIZE,
+    flush_interval=CALCULATE_LOG_FLUSH_INTERVAL,
+    policy=CALCULATE_LOG_OVERFLOW_POLICY,
+    put_timeout=CALCULATE_LOG_PUT_TIMEOUT,
+)
+atexit.register(calculate_log_writer.close)
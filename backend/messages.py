@@ -0,0 +1,89 @@
+"""
+后端生成文案的参数化模板（calculate 的玄学解释与吉日说明）。
+模板取自 backend/locales/<locale>.json 的 calculate 段，形如 "已历{{petMonths}}个宠物月"，
+导入时编译为 str.format 格式，请求时按 locale 本地渲染，不经过机器翻译；
+某语言缺少条目时回退 zh。en.json 缺失的模板可用 `python translate_zh_en.py --write` 离线补齐（不带 --write 只打印译文）。
+"""
+import json
+import os
+import re
+from typing import Dict, Iterable
+
+LOCALES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+# 只编译该前缀下的条目，其余为 C 端界面文案
+TEMPLATE_PREFIX = "calculate"
+DEFAULT_LOCALE = "zh"
+# 多句拼接：中文直接相连，其余语言以空格分隔
+SENTENCE_SEPARATORS = {"zh": ""}
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+def _flatten(prefix: str, obj, out: Dict[str, str]) -> None:
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            _flatten(f"{prefix}.{k}" if prefix else k, v, out)
+    else:
+        out[prefix] = str(obj)
+
+
+def load_locale_file(locale: str) -> dict:
+    """读取 backend/locales/<locale>.json，不存在或格式错误时返回空 dict。"""
+    path = os.path.join(LOCALES_DIR, f"{locale}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def raw_templates(locale: str) -> Dict[str, str]:
+    """某语言 calculate 段的扁平模板原文：{"calculate.dateDesc.lucky": "..."}。"""
+    out: Dict[str, str] = {}
+    section = load_locale_file(locale).get(TEMPLATE_PREFIX)
+    if section:
+        _flatten(TEMPLATE_PREFIX, section, out)
+    return out
+
+
+def compile_template(text: str) -> str:
+    """将 {{name}} 占位符转为 str.format 的 {name}，其余花括号转义。"""
+    parts = []
+    pos = 0
+    for m in _PLACEHOLDER.finditer(text):
+        parts.append(text[pos:m.start()].replace("{", "{{").replace("}", "}}"))
+        parts.append("{" + m.group(1) + "}")
+        pos = m.end()
+    parts.append(text[pos:].replace("{", "{{").replace("}", "}}"))
+    return "".join(parts)
+
+
+def _load_all() -> Dict[str, Dict[str, str]]:
+    compiled: Dict[str, Dict[str, str]] = {}
+    try:
+        names = sorted(os.listdir(LOCALES_DIR))
+    except OSError:
+        names = []
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        locale = name[:-5]
+        compiled[locale] = {k: compile_template(v) for k, v in raw_templates(locale).items()}
+    return compiled
+
+
+_templates = _load_all()
+
+
+def render(key: str, locale: str, **params) -> str:
+    """按 locale 渲染模板，缺失时回退 zh；zh 也缺失时返回 key 本身。"""
+    tpl = _templates.get(locale, {}).get(key)
+    if tpl is None:
+        tpl = _templates.get(DEFAULT_LOCALE, {}).get(key)
+    if tpl is None:
+        return key
+    return tpl.format(**params)
+
+
+def join_sentences(sentences: Iterable[str], locale: str) -> str:
+    return SENTENCE_SEPARATORS.get(locale, " ").join(sentences)
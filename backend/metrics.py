@@ -0,0 +1,288 @@
+"""
+请求与分阶段耗时指标（Prometheus 文本格式，/api/admin/metrics）。
+- pet_http_request_duration_seconds{route, method, status}：before/after_request 钩子记录的整请求耗时；
+- pet_stage_duration_seconds{stage, route}：请求内各阶段耗时，stage 为 db_connect / db_query / translate / hash / serialize，
+  由 db、translate_zh_en、auth_utils 与 app 中的 span() 记录；后台线程中的阶段 route 记为 "-"。
+每个 worker 在内存中累加直方图，至多每 METRICS_FLUSH_INTERVAL 秒把快照写入 METRICS_DIR/metrics-<pid>.json，
+/api/admin/metrics 合并目录下全部快照（直方图各桶与 sum/count 可直接相加），即各 gunicorn worker 的总和。
+只有处理过请求的进程才写快照（迁移、retention 等脚本不留文件）；已退出进程的快照在输出时并入 metrics-retired.json，
+计数保持单调，目录中的文件数不随 worker 重启增长。METRICS_DIR 为空时只输出当前 worker。
+"""
+import atexit
+import json
+import os
+import threading
+import uuid
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from flask import g, has_request_context, request
+
+try:
+    import fcntl
+except ImportError:  # Windows 开发环境：不加锁（单进程运行）
+    fcntl = None
+
+from config import METRICS_ENABLED, METRICS_DIR, METRICS_FLUSH_INTERVAL
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_DURATION = "pet_http_request_duration_seconds"
+STAGE_DURATION = "pet_stage_duration_seconds"
+
+_HELP = {
+    REQUEST_DURATION: ("HTTP request latency by route", ("route", "method", "status")),
+    STAGE_DURATION: ("Time spent in each request stage", ("stage", "route")),
+}
+
+
+class _Histograms:
+    """{指标名: {标签值元组: [各桶计数..., sum, count]}}，桶计数非累积，输出时再累加。"""
+
+    def __init__(self):
+        self._data: Dict[str, Dict[Tuple[str, ...], List[float]]] = {name: {} for name in _HELP}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, labels: Tuple[str, ...], seconds: float) -> None:
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        with self._lock:
+            series = self._data[name].get(labels)
+            if series is None:
+                series = self._data[name][labels] = [0] * (len(BUCKETS) + 1) + [0.0, 0]
+            series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {name: [[list(labels), list(values)] for labels, values in series.items()]
+                    for name, series in self._data.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            for series in self._data.values():
+                series.clear()
+
+
+_histograms = _Histograms()
+_pid = os.getpid()
+_last_flush = 0.0
+# 本进程快照的标识：PID 被新进程复用时，据此识别目录中同名文件属于已退出的旧进程
+_instance = uuid.uuid4().hex
+_owns_snapshot = False
+
+RETIRED_SNAPSHOT = "metrics-retired.json"
+_LOCK_FILE = ".metrics.lock"
+_INSTANCE_KEY = "_instance"
+
+
+def _route() -> str:
+    if not has_request_context():
+        return "-"
+    rule = request.url_rule
+    return rule.rule if rule is not None else "unmatched"
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    if METRICS_ENABLED:
+        _histograms.observe(STAGE_DURATION, (stage, _route()), seconds)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """with span("db_query"): ... 记录一段阶段耗时（异常时同样记录）。"""
+    if not METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def request_started() -> None:
+    if METRICS_ENABLED:
+        g._metrics_started = time.perf_counter()
+
+
+def request_finished(status_code: int) -> None:
+    started = g.pop("_metrics_started", None) if METRICS_ENABLED else None
+    if started is None:
+        return
+    _histograms.observe(REQUEST_DURATION, (_route(), request.method, str(status_code)), time.perf_counter() - started)
+    if time.monotonic() - _last_flush >= METRICS_FLUSH_INTERVAL:
+        flush()
+
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(METRICS_DIR, f"metrics-{pid}.json")
+
+
+@contextmanager
+def _dir_lock() -> Iterator[None]:
+    """METRICS_DIR 内的进程间互斥（并入 retired 与认领快照文件时使用）。"""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(METRICS_DIR, _LOCK_FILE), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read(path: str) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path: str, snapshot: dict) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _add(total: Dict[str, Dict[Tuple[str, ...], List[float]]], snapshot: dict) -> None:
+    for name, series in snapshot.items():
+        if name not in total:
+            continue
+        for labels, values in series:
+            acc = total[name].setdefault(tuple(labels), [0] * len(values))
+            for i, v in enumerate(values):
+                acc[i] += v
+
+
+def _as_snapshot(total: Dict[str, Dict[Tuple[str, ...], List[float]]]) -> dict:
+    return {name: [[list(labels), values] for labels, values in series.items()] for name, series in total.items()}
+
+
+def _retire(paths: List[str]) -> None:
+    """在目录锁内把已退出进程的快照累加进 metrics-retired.json 并删除原文件。"""
+    if not paths:
+        return
+    retired_path = os.path.join(METRICS_DIR, RETIRED_SNAPSHOT)
+    total: Dict[str, Dict[Tuple[str, ...], List[float]]] = {name: {} for name in _HELP}
+    _add(total, _read(retired_path) or {})
+    for path in paths:
+        _add(total, _read(path) or {})
+    _write(retired_path, _as_snapshot(total))
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _retire_dead() -> None:
+    dead = []
+    for name in os.listdir(METRICS_DIR):
+        pid = name[len("metrics-"):-len(".json")] if name.startswith("metrics-") and name.endswith(".json") else ""
+        if pid.isdigit() and int(pid) != os.getpid() and not _pid_alive(int(pid)):
+            dead.append(os.path.join(METRICS_DIR, name))
+    _retire(dead)
+
+
+def flush() -> None:
+    """把当前 worker 的快照原子写入 METRICS_DIR（先写临时文件再改名）；未处理过请求的进程不写。"""
+    global _last_flush, _pid, _instance, _owns_snapshot
+    _last_flush = time.monotonic()
+    if not METRICS_DIR:
+        return
+    if _pid != os.getpid():
+        # fork 出的 worker 不继承父进程（如 preload 时）的计数
+        _pid = os.getpid()
+        _instance = uuid.uuid4().hex
+        _owns_snapshot = False
+        _histograms.reset()
+    snapshot = _histograms.snapshot()
+    if not snapshot[REQUEST_DURATION]:
+        # 迁移、retention 等脚本只有请求外（route 为 "-"）的阶段耗时，不留快照文件
+        return
+    snapshot[_INSTANCE_KEY] = _instance
+    path = _snapshot_path(_pid)
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        if not _owns_snapshot:
+            with _dir_lock():
+                previous = _read(path)
+                if previous is not None and previous.get(_INSTANCE_KEY) != _instance:
+                    # 同一 PID 的旧进程留下的快照，先并入 retired 再覆盖
+                    _retire([path])
+                _write(path, snapshot)
+            _owns_snapshot = True
+        else:
+            _write(path, snapshot)
+    except OSError:
+        pass
+
+
+def _merged() -> Dict[str, Dict[Tuple[str, ...], List[float]]]:
+    merged: Dict[str, Dict[Tuple[str, ...], List[float]]] = {name: {} for name in _HELP}
+    if not (METRICS_DIR and os.path.isdir(METRICS_DIR)):
+        _add(merged, _histograms.snapshot())
+        return merged
+    try:
+        with _dir_lock():
+            _retire_dead()
+            names = sorted(os.listdir(METRICS_DIR))
+            for name in names:
+                if name.startswith("metrics-") and name.endswith(".json"):
+                    _add(merged, _read(os.path.join(METRICS_DIR, name)) or {})
+    except OSError:
+        pass
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: Optional[str] = None) -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}"
+
+
+def render() -> str:
+    """所有 worker 合并后的 Prometheus 文本格式（text/plain; version=0.0.4）。"""
+    flush()
+    lines = []
+    for name, series in _merged().items():
+        help_text, label_names = _HELP[name]
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels in sorted(series):
+            values = series[labels]
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), values):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{name}_bucket{_format_labels(label_names, labels, le)} {int(cumulative)}")
+            lines.append(f"{name}_sum{_format_labels(label_names, labels)} {values[-2]:.6f}")
+            lines.append(f"{name}_count{_format_labels(label_names, labels)} {int(values[-1])}")
+    return "\n".join(lines) + "\n"
+
+
+atexit.register(flush)
@@ -0,0 +1,246 @@
+"""
+版本化数据库迁移（SQLite / MySQL 通用）。
+init_db 建好基础表后调用 migrate()：按版本号顺序执行尚未应用的迁移，并在 schema_migrations 表记录版本。
+MySQL 上的普通索引使用在线变更（ALGORITHM=INPLACE, LOCK=NONE），大表加索引期间不锁读写；例外：
+第 2 个迁移的 FULLTEXT 索引需 LOCK=SHARED（期间阻塞 users 写入），第 3 个迁移首次分区需复制整表（期间阻塞 calculate_logs 写入），
+第 4 个迁移按批回填、耗时与日志行数成正比，这几项应在低峰执行。
+多台部署主机同时执行时以 MySQL 命名锁串行化，等待超时的一方直接报错退出，不会并发执行迁移。
+DDL 无法回滚，每个迁移都写成可重复执行（已存在的索引跳过），中途失败后重跑即可。
+新增迁移：在 MIGRATIONS 末尾追加 (版本号, 说明, 函数)，函数签名为 fn(conn)。
+
+用法: cd backend && python migrations.py   # 或 bash scripts/migrate.sh
+"""
+import logging
+from datetime import date
+from typing import Callable, List, Sequence, Tuple
+
+from config import IS_PRODUCTION, MYSQL_DATABASE
+from db import cursor, get_connection
+
+# MySQL 命名锁：多个进程同时执行迁移时只有一个生效
+_MIGRATION_LOCK = "pet_eternal_flame_migrate"
+
+logger = logging.getLogger(__name__)
+
+
+def _existing_indexes(conn, table: str) -> set:
+    with cursor(conn) as cur:
+        if IS_PRODUCTION:
+            cur.execute(
+                "SELECT DISTINCT index_name AS name FROM information_schema.statistics WHERE table_schema = %s AND table_name = %s",
+                (MYSQL_DATABASE, table),
+            )
+        else:
+            cur.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s", (table,))
+        return {r["name"] for r in cur.fetchall()}
+
+
+def add_indexes(conn, table: str, indexes: Sequence[Tuple[str, str]]) -> None:
+    """为表补齐索引 [(索引名, 列定义)]，已存在的跳过。MySQL 上合并为一条在线 ALTER。"""
+    existing = _existing_indexes(conn, table)
+    missing = [(name, cols) for name, cols in indexes if name not in existing]
+    if not missing:
+        return
+    with cursor(conn) as cur:
+        if IS_PRODUCTION:
+            clauses = ", ".join(f"ADD INDEX `{name}` ({cols})" for name, cols in missing)
+            cur.execute(f"ALTER TABLE `{table}` {clauses}, ALGORITHM=INPLACE, LOCK=NONE")
+        else:
+            for name, cols in missing:
+                cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({cols})")
+    conn.commit()
+
+
+def _m001_query_indexes(conn) -> None:
+    # 统计/管理端按时间、用户、语言筛选 calculate_logs
+    add_indexes(conn, "calculate_logs", [
+        ("idx_calculate_logs_created_at", "created_at"),
+        ("idx_calculate_logs_user_created", "user_id, created_at"),
+        ("idx_calculate_logs_locale_created", "locale, created_at"),
+    ])
+    # C 端按 active + locale + 生效时间窗口查询公告
+    add_indexes(conn, "announcements", [
+        ("idx_announcements_active_window", "active, locale, start_at, end_at"),
+    ])
+
+
+def _m002_username_search(conn) -> None:
+    # 管理端用户名子串搜索的 n-gram 索引，查询见 user_search.py
+    from user_search import FTS_TABLE, FULLTEXT_INDEX
+
+    if IS_PRODUCTION:
+        if FULLTEXT_INDEX in _existing_indexes(conn, "users"):
+            return
+        # FULLTEXT 索引不支持 LOCK=NONE（首次添加需重建表以加入 FTS_DOC_ID），期间允许读、阻塞写。
+        # 停用词表在建索引时绑定到索引：InnoDB 默认表含 a / i / in / is 等，ngram 会丢弃包含停用词的 token，
+        # 用户名的大量 bigram 将无法检索，因此本会话内关闭停用词后再建
+        with cursor(conn) as cur:
+            cur.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+            try:
+                cur.execute(
+                    f"ALTER TABLE `users` ADD FULLTEXT INDEX `{FULLTEXT_INDEX}` (username) WITH PARSER ngram, "
+                    "ALGORITHM=INPLACE, LOCK=SHARED"
+                )
+            finally:
+                cur.execute("SET SESSION innodb_ft_enable_stopword = DEFAULT")
+        conn.commit()
+        return
+    with cursor(conn) as cur:
+        try:
+            cur.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "username, content='users', content_rowid='id', tokenize='trigram')"
+            )
+        except Exception as e:
+            # SQLite < 3.34 没有 trigram 分词
+            logger.warning("跳过 %s（%s），用户名搜索退化为子串 LIKE", FTS_TABLE, e)
+            return
+        # 外部内容表：按 users 现有数据重建索引
+        cur.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+    conn.commit()
+
+
+def _m003_partition_calculate_logs(conn) -> None:
+    # calculate_logs 按月分区（MySQL RANGE 分区 / SQLite 月表 + 视图），保留期与归档见 retention.py。
+    # MySQL 上首次分区需复制整表（不支持 INPLACE），大表应在低峰执行
+    from retention import partition_table
+
+    partition_table(conn)
+
+
+def _m004_dedup_results(conn) -> None:
+    # calculate_logs.result_json 按内容去重到 calculate_results，日志行改记 result_hash（见 result_store.py）
+    import result_store
+    from retention import is_partitioned, list_partitions, physical_tables, _sqlite_rebuild_view
+
+    tables = physical_tables(conn)
+    with cursor(conn) as cur:
+        for table in tables:
+            if IS_PRODUCTION:
+                cur.execute(
+                    "SELECT COUNT(*) AS cnt FROM information_schema.columns "
+                    "WHERE table_schema = %s AND table_name = %s AND column_name = 'result_hash'",
+                    (MYSQL_DATABASE, table),
+                )
+                if not cur.fetchone()["cnt"]:
+                    cur.execute(
+                        f"ALTER TABLE `{table}` ADD COLUMN result_hash CHAR(64) CHARACTER SET ascii NULL AFTER result_json, "
+                        "ALGORITHM=INPLACE, LOCK=NONE"
+                    )
+            else:
+                cur.execute(f"PRAGMA table_info({table})")
+                if "result_hash" not in {r["name"] for r in cur.fetchall()}:
+                    cur.execute(f"ALTER TABLE {table} ADD COLUMN result_hash TEXT")
+    if not IS_PRODUCTION and is_partitioned(conn):
+        # 视图与写入触发器带上新列
+        _sqlite_rebuild_view(conn, list_partitions(conn))
+    conn.commit()
+
+    # 回填：按 id 分批把内联的 result_json 换成 result_hash；每批提交，中断后重跑从剩余行继续。
+    # petName 无法由 pet_name 列原样还原的行（如 null）保留内联 result_json
+    for table in tables:
+        last_id = 0
+        while True:
+            with cursor(conn) as cur:
+                cur.execute(
+                    f"SELECT id, created_at, pet_name, result_json FROM {table} "
+                    "WHERE id > %s AND result_json IS NOT NULL ORDER BY id LIMIT 1000",
+                    (last_id,),
+                )
+                rows = cur.fetchall()
+                if not rows:
+                    break
+                results, updates = {}, []
+                for r in rows:
+                    result_hash, text = result_store.split_legacy(r["result_json"], r["pet_name"])
+                    if not result_hash:
+                        continue
+                    day = str(r["created_at"] or "")[:10] or None
+                    seen = results.get(result_hash, (text, ""))[1]
+                    results[result_hash] = (text, max(day or "", seen))
+                    updates.append((result_hash, r["id"]))
+                result_store.store(cur, [(h, text, day or date.today()) for h, (text, day) in results.items()])
+                cur.executemany(f"UPDATE {table} SET result_hash = %s, result_json = NULL WHERE id = %s", updates)
+            conn.commit()
+            last_id = rows[-1]["id"]
+    # MySQL 上回填后空间需 OPTIMIZE TABLE（或等旧分区按保留期删除）才会归还；SQLite 可执行 VACUUM
+
+
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "calculate_logs / announcements 查询索引", _m001_query_indexes),
+    (2, "users 用户名 n-gram 搜索索引", _m002_username_search),
+    (3, "calculate_logs 按月分区", _m003_partition_calculate_logs),
+    (4, "calculate_logs 结果按内容去重", _m004_dedup_results),
+]
+
+
+def _ensure_version_table(conn) -> None:
+    with cursor(conn) as cur:
+        if IS_PRODUCTION:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INT PRIMARY KEY,
+                    name VARCHAR(255) NOT NULL,
+                    applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+        else:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TEXT DEFAULT (datetime('now'))
+                )
+            """)
+    conn.commit()
+
+
+def current_version(conn) -> int:
+    _ensure_version_table(conn)
+    with cursor(conn) as cur:
+        cur.execute("SELECT MAX(version) AS v FROM schema_migrations")
+        row = cur.fetchone()
+    return int(row["v"] or 0) if row else 0
+
+
+def migrate(conn=None) -> List[int]:
+    """执行所有未应用的迁移，返回本次应用的版本号列表。"""
+    own = conn is None
+    if own:
+        conn = get_connection()
+    applied = []
+    try:
+        if IS_PRODUCTION:
+            with cursor(conn) as cur:
+                cur.execute("SELECT GET_LOCK(%s, 600) AS ok", (_MIGRATION_LOCK,))
+                row = cur.fetchone()
+            # 0 为等待超时、NULL 为出错：此时另一进程可能仍在迁移，不能继续
+            if not row or row["ok"] != 1:
+                raise RuntimeError(f"未能获得迁移锁 {_MIGRATION_LOCK}（另一进程正在执行迁移？），已中止")
+        try:
+            version = current_version(conn)
+            for target, name, fn in MIGRATIONS:
+                if target <= version:
+                    continue
+                fn(conn)
+                with cursor(conn) as cur:
+                    cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (target, name))
+                conn.commit()
+                applied.append(target)
+        finally:
+            if IS_PRODUCTION:
+                with cursor(conn) as cur:
+                    cur.execute("SELECT RELEASE_LOCK(%s) AS ok", (_MIGRATION_LOCK,))
+    finally:
+        if own:
+            conn.close()
+    return applied
+
+
+if __name__ == "__main__":
+    done = migrate()
+    conn = get_connection()
+    try:
+        print(f"已应用迁移: {done or '无'}；当前 schema 版本: {current_version(conn)}")
+    finally:
+        conn.close()
@@ -0,0 +1,106 @@
+"""
+管理端列表分页：基于 id 的 keyset 分页（?cursor= 或 ?before_id=）与兼容的 OFFSET 分页。
+cursor 为不透明字符串（base64url 编码），内容为上一页最后一行的 id，下一页取 id < cursor 的行，
+翻页耗时与页码无关；按相关度排序的搜索结果无法按 id 续页，cursor 中记录的是偏移量。total 可选 exact（COUNT(*)）、approx（计数器或短期缓存的 COUNT）、none。
+"""
+import base64
+import json
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from config import PAGINATION_COUNT_TTL
+
+TOTAL_MODES = ("exact", "approx", "none")
+
+
+def _encode(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _decode(cursor: str, field: str) -> Optional[int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return int(data[field])
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        return None
+
+
+def encode_cursor(last_id) -> str:
+    return _encode({"id": int(last_id)})
+
+
+def decode_cursor(cursor: str) -> Optional[int]:
+    """解析 cursor，非法时返回 None。"""
+    return _decode(cursor, "id")
+
+
+def offset_from_args(args, page: int, per_page: int) -> int:
+    """排序不按 id 的列表（如相关度搜索）：取 cursor 中的偏移量，没有时按 page 计算。"""
+    cursor = args.get("cursor")
+    offset = _decode(cursor, "offset") if cursor else None
+    if offset is None:
+        offset = (max(1, page) - 1) * per_page
+    return max(0, offset)
+
+
+def before_id_from_args(args) -> Tuple[bool, Optional[int]]:
+    """从查询参数取 keyset 位置：返回 (是否 keyset 模式, before_id)。cursor 非法时按第一页处理。"""
+    cursor = args.get("cursor")
+    if cursor:
+        return True, decode_cursor(cursor)
+    before_id = args.get("before_id", type=int)
+    if before_id is not None:
+        return True, before_id
+    return False, None
+
+
+def total_mode(args, keyset: bool) -> str:
+    mode = (args.get("total") or "").lower()
+    if mode in TOTAL_MODES:
+        return mode
+    # 兼容旧调用：OFFSET 分页默认精确总数；keyset 分页默认近似总数
+    return "approx" if keyset else "exact"
+
+
+def page_meta(rows: list, per_page: int) -> Tuple[list, Optional[str]]:
+    """rows 为多取一行（per_page + 1）的查询结果，返回 (当前页行, next_cursor)。"""
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        return rows, encode_cursor(rows[-1]["id"])
+    return rows, None
+
+
+def offset_page_meta(rows: list, per_page: int, offset: int) -> Tuple[list, Optional[str]]:
+    """同 page_meta，但 next_cursor 记录下一页的偏移量。"""
+    if len(rows) > per_page:
+        return rows[:per_page], _encode({"offset": offset + per_page})
+    return rows, None
+
+
+class CountCache:
+    """COUNT(*) 结果的短期缓存（PAGINATION_COUNT_TTL 秒），供 total=approx 使用。"""
+
+    def __init__(self, ttl: float, maxsize: int = 256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[tuple, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, counter: Callable[[], int]) -> int:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is not None and now - entry[0] < self.ttl:
+            return entry[1]
+        value = counter()
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                self._data.clear()
+            self._data[key] = (now, value)
+        return value
+
+
+count_cache = CountCache(PAGINATION_COUNT_TTL)
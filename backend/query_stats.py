@@ -0,0 +1,119 @@
+"""
+SQL 指纹统计与慢查询日志（db.cursor 的游标代理在每次 execute / executemany 后调用 record()）。
+指纹：去掉字面量与占位符差异后的语句形状（字符串、数字、%s / ? 统一为 ?，IN 列表与多行 VALUES 折叠），
+按指纹累计次数、总耗时与最大耗时（当前 worker 进程，/api/admin/slow-queries 查看）。
+耗时超过 SLOW_QUERY_MS 的语句以 WARNING 记入 slow_query 日志：只输出指纹与参数类型/长度，不输出参数值。
+"""
+import logging
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List
+
+from config import QUERY_STATS_ENABLED, QUERY_STATS_MAX_FINGERPRINTS, SLOW_QUERY_MS
+
+logger = logging.getLogger("slow_query")
+
+# 指纹数超过上限后新出现的语句都计入该项，避免动态拼接的 SQL 撑爆内存
+OVERFLOW_FINGERPRINT = "(other)"
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r"(?<![\w`\"])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+_VALUES_ROWS = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql: str) -> str:
+    """SQL -> 指纹；同一形状、不同参数或字面量的语句得到同一指纹。"""
+    text = _STRING.sub("?", sql)
+    text = _NUMBER.sub("?", text)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _SPACE.sub(" ", text).strip()
+    text = _IN_LIST.sub("IN (?+)", text)
+    return _VALUES_ROWS.sub(r"\1+", text)
+
+
+def redact(args) -> str:
+    """参数只保留类型与长度，例如 (str:12, int, None)。"""
+    if args is None:
+        return "()"
+    if isinstance(args, dict):
+        return "{" + ", ".join(f"{k}: {_describe(v)}" for k, v in args.items()) + "}"
+    if isinstance(args, (list, tuple)):
+        return "(" + ", ".join(_describe(v) for v in args) + ")"
+    return _describe(args)
+
+
+def _describe(value) -> str:
+    if value is None:
+        return "None"
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}:{len(value)}"
+    return type(value).__name__
+
+
+class QueryStats:
+    def __init__(self, max_fingerprints: int):
+        self.max_fingerprints = max(1, max_fingerprints)
+        # 指纹 -> [次数, 总秒数, 最大秒数, 慢查询次数, 影响行数（executemany 的参数组数）]
+        self._data: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, args, seconds: float, many: bool = False) -> None:
+        fp = fingerprint(sql)
+        slow = SLOW_QUERY_MS > 0 and seconds * 1000 >= SLOW_QUERY_MS
+        rows = len(args) if many and hasattr(args, "__len__") else 1
+        with self._lock:
+            entry = self._data.get(fp)
+            if entry is None:
+                if len(self._data) >= self.max_fingerprints:
+                    fp = OVERFLOW_FINGERPRINT
+                    entry = self._data.setdefault(fp, [0, 0.0, 0.0, 0, 0])
+                else:
+                    entry = self._data[fp] = [0, 0.0, 0.0, 0, 0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            entry[3] += slow
+            entry[4] += rows
+        if slow:
+            params = f"{rows} rows" if many else redact(args)
+            logger.warning("slow query %.1fms: %s params=%s", seconds * 1000, fp, params)
+
+    def top(self, limit: int = 20, sort: str = "total") -> List[dict]:
+        """按 total（总耗时）/ max / count / avg 倒序的前 limit 个指纹。"""
+        with self._lock:
+            items = [(fp, list(v)) for fp, v in self._data.items()]
+        rows = [
+            {
+                "fingerprint": fp,
+                "count": count,
+                "total_ms": round(total * 1000, 3),
+                "avg_ms": round(total / count * 1000, 3) if count else 0.0,
+                "max_ms": round(peak * 1000, 3),
+                "slow": slow,
+                "rows": rows,
+            }
+            for fp, (count, total, peak, slow, rows) in items
+        ]
+        key = {"total": "total_ms", "max": "max_ms", "count": "count", "avg": "avg_ms"}.get(sort, "total_ms")
+        rows.sort(key=lambda r: r[key], reverse=True)
+        return rows[:max(0, limit)]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+query_stats = QueryStats(QUERY_STATS_MAX_FINGERPRINTS)
+
+
+def record(sql: str, args, seconds: float, many: bool = False) -> None:
+    if QUERY_STATS_ENABLED:
+        query_stats.record(sql, args, seconds, many)
@@ -0,0 +1,59 @@
+"""
+按自然日作用域的 LRU 缓存：用于 /api/calculate 结果，键中含当天日期。
+跨过本地午夜（today 变化）时整体清空，旧日期的条目不会再被命中；容量满时淘汰最久未用条目。
+"""
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Hashable, Optional
+
+
+class DayScopedLRU:
+    def __init__(self, maxsize: int):
+        self.maxsize = max(0, maxsize)
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._day: Optional[date] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _roll(self, today: date) -> None:
+        if self._day != today:
+            self._data.clear()
+            self._day = today
+
+    def get(self, key: Hashable, today: date) -> Any:
+        with self._lock:
+            self._roll(today)
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, today: date) -> None:
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._roll(today)
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "day": self._day.isoformat() if self._day else None,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,121 @@
+"""
+calculate_logs 结果去重存储（按内容寻址）。
+计算结果只取决于 (死亡日期, 当天, locale)，大量日志的 result_json 完全相同。结果本体（不含 petName）
+按规范化 JSON 的 sha256 存入 calculate_results 一次，日志行只记 result_hash；读取时用 pet_name 列拼回原结构。
+pet_name 列无法原样还原 petName 的行（null、非字符串、超过 128 字符）仍把完整结果内联在 result_json，不做去重。
+calculate_results.last_seen 为最近一次被日志引用的日期，保留期清理删除分区后据此回收不再被引用的结果。
+"""
+import hashlib
+import json
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from config import IS_PRODUCTION
+
+# 日志中完整结果的字段顺序（与 /api/calculate 响应一致）
+RESULT_KEYS = ("petMonths", "deathDate", "petName", "suggestedQuantity", "burningDates", "explanation")
+
+
+def digest(fields: dict) -> Tuple[str, str]:
+    """结果本体（不含 petName）-> (sha256 十六进制, 规范化 JSON 文本)。"""
+    text = json.dumps(fields, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest(), text
+
+
+def pet_name_column(pet_name) -> str:
+    """calculate_logs.pet_name 列的取值：非字符串记空串，截断到 128 字符。"""
+    return pet_name[:128] if isinstance(pet_name, str) else ""
+
+
+def assemble(fields: dict, pet_name) -> dict:
+    """结果本体 + petName，按 RESULT_KEYS 排列（与 /api/calculate 响应一致）。"""
+    full = {**fields, "petName": pet_name}
+    ordered = {k: full[k] for k in RESULT_KEYS if k in full}
+    ordered.update((k, v) for k, v in full.items() if k not in ordered)
+    return ordered
+
+
+def split_legacy(result_json, pet_name) -> Tuple[Optional[str], Optional[str]]:
+    """
+    旧格式整行 result_json（含 petName）-> (hash, 规范化文本)。
+    为空、不是对象、字段集合不是 RESULT_KEYS，或用 pet_name 列无法原样拼回（petName 为 null / 非字符串 / 被截断）时
+    返回 (None, None)，调用方应保留内联的 result_json。
+    只比较内容不比较字段顺序：MySQL 的 JSON 列存储时会重排对象的键，读回时顺序由 assemble 按 RESULT_KEYS 决定。
+    """
+    if result_json is None:
+        return None, None
+    result = json.loads(result_json) if isinstance(result_json, (str, bytes)) else result_json
+    if not isinstance(result, dict) or set(result) != set(RESULT_KEYS):
+        return None, None
+    if not isinstance(pet_name, str) or result["petName"] != pet_name:
+        return None, None
+    return digest({k: v for k, v in result.items() if k != "petName"})
+
+
+def reconstruct(pet_name, stored_json, legacy_json=None) -> Optional[dict]:
+    """还原日志当时的完整结果：内联了 result_json 的行直接用它，其余用 calculate_results 的本体 + pet_name。"""
+    if legacy_json is not None:
+        return json.loads(legacy_json) if isinstance(legacy_json, (str, bytes)) else legacy_json
+    if stored_json is None:
+        return None
+    fields = json.loads(stored_json) if isinstance(stored_json, (str, bytes)) else stored_json
+    return assemble(fields, pet_name)
+
+
+def reconstruct_text(pet_name, stored_json, legacy_json=None) -> Optional[str]:
+    """同 reconstruct，返回与去重前写入的 result_json 相同格式的文本。"""
+    result = reconstruct(pet_name, stored_json, legacy_json)
+    return None if result is None else json.dumps(result)
+
+
+def store(cur, results: Iterable[Tuple[str, str, date]]) -> None:
+    """在调用方事务中写入 [(hash, 文本, 引用日期)]；已存在的只推进 last_seen。"""
+    rows = [(h, text, day.isoformat() if isinstance(day, date) else day) for h, text, day in results]
+    if not rows:
+        return
+    if IS_PRODUCTION:
+        cur.executemany(
+            "INSERT INTO calculate_results (hash, result_json, last_seen) VALUES (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE last_seen = GREATEST(last_seen, VALUES(last_seen))",
+            rows,
+        )
+    else:
+        cur.executemany(
+            "INSERT INTO calculate_results (hash, result_json, last_seen) VALUES (%s, %s, %s) "
+            "ON CONFLICT(hash) DO UPDATE SET last_seen = MAX(last_seen, excluded.last_seen)",
+            rows,
+        )
+
+
+def prune(cur) -> int:
+    """
+    删除不再被现存日志引用的结果，返回删除条数。
+    结果的 last_seen 不早于引用它的日志的日期，早于最早现存日志（留一天余量，覆盖 UTC 与本地日期之差）的即可回收。
+    """
+    cur.execute("SELECT MIN(created_at) AS oldest FROM calculate_logs")
+    row = cur.fetchone()
+    oldest = row["oldest"] if row else None
+    # MySQL 返回 datetime，SQLite 返回文本，统一取日期部分
+    before = date.fromisoformat(str(oldest)[:10]) if oldest is not None else date.today()
+    cur.execute("DELETE FROM calculate_results WHERE last_seen < %s", ((before - timedelta(days=1)).isoformat(),))
+    return max(0, cur.rowcount)
+
+
+class KnownHashes:
+    """写入线程记住当天已写过的 hash，同一天内不重复写 calculate_results；跨天清空以便推进 last_seen。"""
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self._day: Optional[date] = None
+        self._hashes: Dict[str, None] = {}
+
+    def missing(self, hashes: Iterable[str], today: date) -> set:
+        if self._day != today:
+            self._hashes.clear()
+            self._day = today
+        return {h for h in hashes if h not in self._hashes}
+
+    def add(self, hashes: Iterable[str]) -> None:
+        if len(self._hashes) > self.maxsize:
+            self._hashes.clear()
+        self._hashes.update(dict.fromkeys(hashes))
@@ -0,0 +1,522 @@
+"""
+calculate_logs 保留期、按月分区与归档。
+
+MySQL：按 TO_DAYS(created_at) 的 RANGE 月分区（p202610 … 加 pmax 兜底），主键改为 (id, created_at)。
+SQLite：每月一张表 calculate_logs_p202610，calculate_logs 为按 UNION ALL 拼接的视图，
+写入由视图上的 INSTEAD OF INSERT 触发器按 created_at 分发到对应月表，id 由 calculate_logs_seq 统一分配。
+两者语义一致：最早的分区兜住更早的数据，最新的分区兜住之后的数据（对应 MySQL 的 pmax），新增月份时从相邻分区拆出。
+
+run() 每月（或每日）执行一次：预建未来 CALCULATE_LOG_PARTITIONS_AHEAD 个月的分区；
+早于保留期（CALCULATE_LOG_RETENTION_MONTHS 个月，含当月）的分区先整体归档为 gzip NDJSON，再 DROP 分区（不逐行 DELETE）。
+restore() 把归档文件重新导入（重建该月分区），用于临时查询；若仍在保留期外，下次 run() 会再次归档并删除。
+被删除的行数计入 calculates.archived 计数器，累计计算次数不受影响。
+
+用法: cd backend && python retention.py run|list|archive 202401|restore 202401   # 或 bash scripts/retention.sh
+"""
+import gzip
+import json
+import logging
+import os
+import sys
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from config import (
+    IS_PRODUCTION,
+    MYSQL_DATABASE,
+    CALCULATE_LOG_RETENTION_MONTHS,
+    CALCULATE_LOG_PARTITIONS_AHEAD,
+    CALCULATE_LOG_ARCHIVE_DIR,
+)
+from db import cursor, get_connection, streaming_cursor
+import result_store
+import stat_counters
+
+logger = logging.getLogger(__name__)
+
+TABLE = "calculate_logs"
+COLUMNS = ["id", "user_id", "pet_name", "death_date", "locale", "result_json", "result_hash", "created_at"]
+# 归档文件每行的字段：result_json 为还原后的完整结果，归档自包含、不依赖 calculate_results
+ARCHIVE_COLUMNS = ["id", "user_id", "pet_name", "death_date", "locale", "result_json", "created_at"]
+SEQ_TABLE = "calculate_logs_seq"
+_BATCH = 1000
+
+_SQLITE_MONTH_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER,
+        pet_name TEXT,
+        death_date TEXT NOT NULL,
+        locale TEXT NOT NULL DEFAULT 'zh',
+        result_json TEXT,
+        result_hash TEXT,
+        created_at TEXT DEFAULT (datetime('now'))
+    )
+"""
+
+
+# ----- 月份工具 -----
+
+def month_of(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_key(month: date) -> str:
+    return f"{month.year:04d}{month.month:02d}"
+
+
+def parse_month(key: str) -> date:
+    """'202401' 或 '2024-01' -> date(2024, 1, 1)。"""
+    return datetime.strptime(key.replace("-", ""), "%Y%m").date()
+
+
+def partition_name(month: date) -> str:
+    return f"p{month_key(month)}"
+
+
+def _sqlite_table(month: date) -> str:
+    return f"{TABLE}_{partition_name(month)}"
+
+
+def archive_path(month: date) -> str:
+    return os.path.join(CALCULATE_LOG_ARCHIVE_DIR, f"{TABLE}-{month_key(month)}.ndjson.gz")
+
+
+# ----- 分区列表 -----
+
+def is_partitioned(conn) -> bool:
+    with cursor(conn) as cur:
+        if IS_PRODUCTION:
+            cur.execute(
+                "SELECT COUNT(*) AS cnt FROM information_schema.partitions "
+                "WHERE table_schema = %s AND table_name = %s AND partition_name IS NOT NULL",
+                (MYSQL_DATABASE, TABLE),
+            )
+            return int(cur.fetchone()["cnt"]) > 0
+        cur.execute("SELECT type FROM sqlite_master WHERE name = %s", (TABLE,))
+        row = cur.fetchone()
+        return bool(row) and row["type"] == "view"
+
+
+def list_partitions(conn) -> List[date]:
+    """已有的月分区（升序，不含 MySQL 的 pmax）。"""
+    with cursor(conn) as cur:
+        if IS_PRODUCTION:
+            cur.execute(
+                "SELECT partition_name AS name FROM information_schema.partitions "
+                "WHERE table_schema = %s AND table_name = %s AND partition_name IS NOT NULL "
+                "ORDER BY partition_ordinal_position",
+                (MYSQL_DATABASE, TABLE),
+            )
+            names = [r["name"] for r in cur.fetchall() if r["name"] != "pmax"]
+            return [parse_month(n[1:]) for n in names]
+        cur.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB %s",
+            (f"{TABLE}_p[0-9][0-9][0-9][0-9][0-9][0-9]",),
+        )
+        return sorted(parse_month(r["name"][-6:]) for r in cur.fetchall())
+
+
+# ----- MySQL -----
+
+def _mysql_partition_clause(month: date) -> str:
+    return f"PARTITION {partition_name(month)} VALUES LESS THAN (TO_DAYS('{add_months(month, 1).isoformat()}'))"
+
+
+def _mysql_partition_table(conn, months: List[date]) -> None:
+    with cursor(conn) as cur:
+        cur.execute(f"UPDATE {TABLE} SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+        # 分区键必须包含在主键中；AUTO_INCREMENT 的 id 仍是主键首列
+        cur.execute(
+            f"ALTER TABLE {TABLE} MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+            "DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)"
+        )
+        clauses = ", ".join([_mysql_partition_clause(m) for m in months] + ["PARTITION pmax VALUES LESS THAN MAXVALUE"])
+        cur.execute(f"ALTER TABLE {TABLE} PARTITION BY RANGE (TO_DAYS(created_at)) ({clauses})")
+    conn.commit()
+
+
+def _mysql_add_month(conn, month: date, existing: List[date]) -> None:
+    with cursor(conn) as cur:
+        if existing and month < existing[0]:
+            # 早于最早分区（恢复归档时）：只从最早分区拆出该月，中间月份仍归最早分区
+            first = existing[0]
+            clauses = f"{_mysql_partition_clause(month)}, {_mysql_partition_clause(first)}"
+            cur.execute(f"ALTER TABLE {TABLE} REORGANIZE PARTITION {partition_name(first)} INTO ({clauses})")
+        else:
+            start = add_months(existing[-1], 1) if existing else month
+            clauses = ", ".join(
+                [_mysql_partition_clause(m) for m in _month_range(start, month)]
+                + ["PARTITION pmax VALUES LESS THAN MAXVALUE"]
+            )
+            cur.execute(f"ALTER TABLE {TABLE} REORGANIZE PARTITION pmax INTO ({clauses})")
+    conn.commit()
+
+
+# ----- SQLite -----
+
+def _sqlite_rebuild_view(conn, months: List[date]) -> None:
+    """按现有月表重建 calculate_logs 视图与写入触发器（删除视图会一并删除其触发器）。"""
+    cols = ", ".join(COLUMNS)
+    ts = "COALESCE(NEW.created_at, datetime('now'))"
+    with cursor(conn) as cur:
+        cur.execute(f"DROP VIEW IF EXISTS {TABLE}")
+        cur.execute(
+            f"CREATE VIEW {TABLE} AS "
+            + " UNION ALL ".join(f"SELECT {cols} FROM {_sqlite_table(m)}" for m in months)
+        )
+        for i, month in enumerate(months):
+            # 与 MySQL 的 VALUES LESS THAN 一致：每张月表承接上一张月表之后、本月结束之前的数据
+            conds = []
+            if i > 0:
+                conds.append(f"{ts} >= '{add_months(months[i - 1], 1).isoformat()}'")
+            if i < len(months) - 1:
+                conds.append(f"{ts} < '{add_months(month, 1).isoformat()}'")
+            when = f"WHEN {' AND '.join(conds)} " if conds else ""
+            cur.execute(f"""
+                CREATE TRIGGER {TABLE}_ins_{partition_name(month)} INSTEAD OF INSERT ON {TABLE} {when}
+                BEGIN
+                    UPDATE {SEQ_TABLE} SET value = value + 1 WHERE NEW.id IS NULL;
+                    UPDATE {SEQ_TABLE} SET value = MAX(value, NEW.id) WHERE NEW.id IS NOT NULL;
+                    INSERT INTO {_sqlite_table(month)} ({cols}) VALUES (
+                        COALESCE(NEW.id, (SELECT value FROM {SEQ_TABLE})), NEW.user_id, NEW.pet_name,
+                        NEW.death_date, COALESCE(NEW.locale, 'zh'), NEW.result_json, NEW.result_hash, {ts}
+                    );
+                END
+            """)
+
+
+def _sqlite_create_month(cur, month: date) -> None:
+    name = _sqlite_table(month)
+    cur.execute(_SQLITE_MONTH_TABLE.format(name=name))
+    cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_created_at ON {name} (created_at)")
+    cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_user_created ON {name} (user_id, created_at)")
+    cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_locale_created ON {name} (locale, created_at)")
+
+
+def _sqlite_partition_table(conn, months: List[date]) -> None:
+    """把普通表 calculate_logs 转为月表 + 视图，保留原 id。"""
+    with cursor(conn) as cur:
+        # 只复制旧表已有的列（旧表可能早于后续迁移新增的列）
+        cur.execute(f"PRAGMA table_info({TABLE})")
+        legacy_columns = {r["name"] for r in cur.fetchall()}
+        cols = ", ".join(c for c in COLUMNS if c in legacy_columns)
+        cur.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_legacy")
+        cur.execute(f"CREATE TABLE IF NOT EXISTS {SEQ_TABLE} (id INTEGER PRIMARY KEY CHECK (id = 1), value INTEGER NOT NULL)")
+        cur.execute(f"SELECT COALESCE(MAX(id), 0) AS max_id FROM {TABLE}_legacy")
+        max_id = int(cur.fetchone()["max_id"])
+        # AUTOINCREMENT 记录的最大值可能大于现存最大 id（删除过行），取两者较大者避免复用
+        cur.execute("SELECT seq FROM sqlite_sequence WHERE name = %s", (f"{TABLE}_legacy",))
+        row = cur.fetchone()
+        if row:
+            max_id = max(max_id, int(row["seq"]))
+        cur.execute(f"INSERT OR REPLACE INTO {SEQ_TABLE} (id, value) VALUES (1, %s)", (max_id,))
+        for i, month in enumerate(months):
+            _sqlite_create_month(cur, month)
+            conds, params = [], []
+            if i > 0:
+                conds.append("created_at >= %s")
+                params.append(add_months(months[i - 1], 1).isoformat())
+            if i < len(months) - 1:
+                conds.append("created_at < %s")
+                params.append(add_months(month, 1).isoformat())
+            where = f" WHERE {' AND '.join(conds)}" if conds else ""
+            cur.execute(
+                f"INSERT INTO {_sqlite_table(month)} ({cols}) SELECT {cols} FROM {TABLE}_legacy{where}",
+                tuple(params),
+            )
+        cur.execute(f"DROP TABLE {TABLE}_legacy")
+    _sqlite_rebuild_view(conn, months)
+    conn.commit()
+
+
+def _sqlite_add_month(conn, month: date, existing: List[date]) -> None:
+    cols = ", ".join(COLUMNS)
+    with cursor(conn) as cur:
+        _sqlite_create_month(cur, month)
+        if existing and month < existing[0]:
+            # 最早的月表兜住更早的数据：把早于其起始的行移到新表
+            source, cond = existing[0], "created_at < %s"
+            boundary = add_months(month, 1).isoformat()
+        elif existing and month > existing[-1]:
+            # 最新的月表兜住之后的数据：把已落入新月份的行移过去
+            source, cond = existing[-1], "created_at >= %s"
+            boundary = add_months(existing[-1], 1).isoformat()
+        else:
+            source = None
+        if source is not None:
+            src = _sqlite_table(source)
+            cur.execute(f"INSERT INTO {_sqlite_table(month)} ({cols}) SELECT {cols} FROM {src} WHERE {cond}", (boundary,))
+            cur.execute(f"DELETE FROM {src} WHERE {cond}", (boundary,))
+    _sqlite_rebuild_view(conn, sorted(existing + [month]))
+    conn.commit()
+
+
+# ----- 公共操作 -----
+
+def _month_range(first: date, last: date) -> List[date]:
+    months = []
+    m = first
+    while m <= last:
+        months.append(m)
+        m = add_months(m, 1)
+    return months
+
+
+def partition_table(conn, today: Optional[date] = None) -> None:
+    """把未分区的 calculate_logs 转为按月分区（migrations 调用）。已分区时跳过。"""
+    if is_partitioned(conn):
+        return
+    current = month_of(today or date.today())
+    with cursor(conn) as cur:
+        cur.execute(f"SELECT MIN(created_at) AS oldest FROM {TABLE}")
+        oldest = cur.fetchone()["oldest"]
+    first = month_of(oldest if isinstance(oldest, date) else date.fromisoformat(str(oldest)[:10])) if oldest else current
+    months = _month_range(min(first, current), add_months(current, CALCULATE_LOG_PARTITIONS_AHEAD))
+    if IS_PRODUCTION:
+        _mysql_partition_table(conn, months)
+    else:
+        _sqlite_partition_table(conn, months)
+
+
+def ensure_month(conn, month: date) -> bool:
+    """确保该月有独立分区，返回是否新建。"""
+    existing = list_partitions(conn)
+    if month in existing:
+        return False
+    if existing and existing[0] < month < existing[-1]:
+        # 分区按月连续，中间缺失说明被手工删除过，需人工处理
+        raise ValueError(f"{TABLE} 缺少中间分区 {month_key(month)}")
+    if IS_PRODUCTION:
+        _mysql_add_month(conn, month, existing)
+    else:
+        _sqlite_add_month(conn, month, existing)
+    return True
+
+
+def ensure_partitions(conn, today: Optional[date] = None, ahead: int = CALCULATE_LOG_PARTITIONS_AHEAD) -> List[date]:
+    """预建当月起 ahead 个月的分区，返回新建的月份。"""
+    if not is_partitioned(conn):
+        return []
+    current = month_of(today or date.today())
+    existing = list_partitions(conn)
+    last = existing[-1] if existing else add_months(current, -1)
+    created = []
+    for month in _month_range(add_months(last, 1), add_months(current, ahead)):
+        ensure_month(conn, month)
+        created.append(month)
+    return created
+
+
+def physical_tables(conn) -> List[str]:
+    """实际存放日志行的表：MySQL 为 calculate_logs 本身，SQLite 为各月表（未分区时为 calculate_logs）。"""
+    if IS_PRODUCTION or not is_partitioned(conn):
+        return [TABLE]
+    return [_sqlite_table(m) for m in list_partitions(conn)]
+
+
+def _select_partition(month: date) -> str:
+    # 关联 calculate_results 还原完整结果；旧行的结果仍内联在 result_json
+    cols = ", ".join(f"l.{c}" for c in ARCHIVE_COLUMNS if c != "result_json")
+    source = f"{TABLE} PARTITION ({partition_name(month)})" if IS_PRODUCTION else _sqlite_table(month)
+    return (
+        f"SELECT {cols}, l.result_json AS legacy_json, r.result_json AS stored_json FROM {source} AS l "
+        "LEFT JOIN calculate_results r ON r.hash = l.result_hash ORDER BY l.id"
+    )
+
+
+def archive_partition(conn, month: date) -> Dict:
+    """把一个月分区整体写入 gzip NDJSON 归档（先写临时文件再改名），返回 {path, rows}。"""
+    os.makedirs(CALCULATE_LOG_ARCHIVE_DIR, exist_ok=True)
+    path = archive_path(month)
+    if os.path.exists(path) and _partition_rows(conn, month) == 0:
+        # 已有归档而分区为空：保留原归档，不用空文件覆盖
+        return {"path": path, "rows": 0}
+    tmp = path + ".tmp"
+    rows = 0
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        with streaming_cursor(conn) as cur:
+            cur.execute(_select_partition(month))
+            while True:
+                batch = cur.fetchmany(_BATCH)
+                if not batch:
+                    break
+                for r in batch:
+                    r["result_json"] = result_store.reconstruct_text(r["pet_name"], r["stored_json"], r["legacy_json"])
+                    item = {c: (str(r[c]) if isinstance(r[c], (date, datetime)) else r[c]) for c in ARCHIVE_COLUMNS}
+                    f.write(json.dumps(item, ensure_ascii=False, separators=(",", ":")) + "\n")
+                rows += len(batch)
+    os.replace(tmp, path)
+    return {"path": path, "rows": rows}
+
+
+def _partition_rows(conn, month: date) -> int:
+    with cursor(conn) as cur:
+        if IS_PRODUCTION:
+            cur.execute(f"SELECT COUNT(*) AS cnt FROM {TABLE} PARTITION ({partition_name(month)})")
+        else:
+            cur.execute(f"SELECT COUNT(*) AS cnt FROM {_sqlite_table(month)}")
+        return int(cur.fetchone()["cnt"])
+
+
+def drop_partition(conn, month: date, rows: int) -> None:
+    """删除一个月分区（DDL，不逐行删除），rows 计入 calculates.archived。"""
+    existing = list_partitions(conn)
+    with cursor(conn) as cur:
+        if IS_PRODUCTION:
+            cur.execute(f"ALTER TABLE {TABLE} DROP PARTITION {partition_name(month)}")
+        else:
+            cur.execute(f"DROP TABLE {_sqlite_table(month)}")
+        stat_counters.increment(cur, stat_counters.CALCULATES_ARCHIVED, rows)
+    if not IS_PRODUCTION:
+        _sqlite_rebuild_view(conn, [m for m in existing if m != month])
+    conn.commit()
+
+
+def run(conn=None, today: Optional[date] = None, archive: bool = True) -> Dict:
+    """预建分区、归档并删除保留期外的分区，回收不再被引用的结果。返回 {created, archived, dropped, results_pruned}。"""
+    own = conn is None
+    if own:
+        conn = get_connection()
+    result = {"created": [], "archived": [], "dropped": [], "results_pruned": 0}
+    try:
+        if not is_partitioned(conn):
+            partition_table(conn, today)
+        result["created"] = [month_key(m) for m in ensure_partitions(conn, today)]
+        if CALCULATE_LOG_RETENTION_MONTHS <= 0:
+            return result
+        keep_from = add_months(month_of(today or date.today()), -(CALCULATE_LOG_RETENTION_MONTHS - 1))
+        existing = list_partitions(conn)
+        for month in existing:
+            # 至少保留一个分区：最早分区兜底承接更早的数据
+            if month >= keep_from or month == existing[-1]:
+                break
+            if archive:
+                info = archive_partition(conn, month)
+                result["archived"].append({"month": month_key(month), **info})
+                rows = info["rows"]
+            else:
+                rows = _partition_rows(conn, month)
+            drop_partition(conn, month, rows)
+            result["dropped"].append(month_key(month))
+        if result["dropped"]:
+            # 回收已不被任何现存日志引用的去重结果
+            with cursor(conn) as cur:
+                result["results_pruned"] = result_store.prune(cur)
+            conn.commit()
+    finally:
+        if own:
+            conn.close()
+    return result
+
+
+def restore(month: date, conn=None) -> int:
+    """把归档文件导回 calculate_logs（已存在的 id 跳过），返回导入行数。"""
+    path = archive_path(month)
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    own = conn is None
+    if own:
+        conn = get_connection()
+    # 导回时结果重新按内容去重：本体写入 calculate_results，日志行只记 result_hash（无法还原 petName 的行仍内联）
+    columns = COLUMNS
+    cols = ", ".join(columns)
+    placeholders = ", ".join(["%s"] * len(columns))
+    if IS_PRODUCTION:
+        sql = f"INSERT IGNORE INTO {TABLE} ({cols}) VALUES ({placeholders})"
+    else:
+        sql = f"INSERT OR IGNORE INTO {_sqlite_table(month)} ({cols}) VALUES ({placeholders})"
+    restored = 0
+    try:
+        ensure_month(conn, month)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            batch = []
+            for line in f:
+                if not line.strip():
+                    continue
+                batch.append(json.loads(line))
+                if len(batch) >= _BATCH:
+                    restored += _restore_batch(conn, sql, columns, batch)
+                    batch = []
+            if batch:
+                restored += _restore_batch(conn, sql, columns, batch)
+        with cursor(conn) as cur:
+            stat_counters.increment(cur, stat_counters.CALCULATES_ARCHIVED, -restored)
+        conn.commit()
+    finally:
+        if own:
+            conn.close()
+    return restored
+
+
+def _restore_batch(conn, sql: str, columns: List[str], items: List[dict]) -> int:
+    results = {}
+    rows = []
+    for item in items:
+        result_hash, text = result_store.split_legacy(item.get("result_json"), item.get("pet_name"))
+        if result_hash:
+            day = str(item.get("created_at") or date.today())[:10]
+            results[result_hash] = (text, max(day, results.get(result_hash, ("", ""))[1]))
+            item["result_json"] = None
+        item["result_hash"] = result_hash
+        rows.append(tuple(item.get(c) for c in columns))
+    with cursor(conn) as cur:
+        result_store.store(cur, [(h, text, day) for h, (text, day) in results.items()])
+        cur.executemany(sql, rows)
+        count = max(0, cur.rowcount)
+    conn.commit()
+    return count
+
+
+def status(conn) -> Dict:
+    """分区与归档文件概况（管理端展示）。MySQL 的行数取自 information_schema，为估算值。"""
+    if IS_PRODUCTION:
+        with cursor(conn) as cur:
+            cur.execute(
+                "SELECT partition_name AS name, table_rows AS rows_estimate FROM information_schema.partitions "
+                "WHERE table_schema = %s AND table_name = %s AND partition_name IS NOT NULL "
+                "ORDER BY partition_ordinal_position",
+                (MYSQL_DATABASE, TABLE),
+            )
+            partitions = [{"month": r["name"][1:], "rows": int(r["rows_estimate"] or 0)} for r in cur.fetchall()]
+    else:
+        partitions = [{"month": month_key(m), "rows": _partition_rows(conn, m)} for m in list_partitions(conn)]
+    archives = []
+    if os.path.isdir(CALCULATE_LOG_ARCHIVE_DIR):
+        for name in sorted(os.listdir(CALCULATE_LOG_ARCHIVE_DIR)):
+            if name.startswith(f"{TABLE}-") and name.endswith(".ndjson.gz"):
+                full = os.path.join(CALCULATE_LOG_ARCHIVE_DIR, name)
+                archives.append({"month": name[len(TABLE) + 1:len(TABLE) + 7], "bytes": os.path.getsize(full)})
+    return {
+        "retention_months": CALCULATE_LOG_RETENTION_MONTHS,
+        "partitions": partitions,
+        "archives": archives,
+    }
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "run"
+    if command == "run":
+        print(json.dumps(run(), ensure_ascii=False, indent=2))
+    elif command == "list":
+        conn = get_connection()
+        try:
+            print(json.dumps(status(conn), ensure_ascii=False, indent=2))
+        finally:
+            conn.close()
+    elif command == "archive" and len(sys.argv) > 2:
+        conn = get_connection()
+        try:
+            print(json.dumps(archive_partition(conn, parse_month(sys.argv[2])), ensure_ascii=False))
+        finally:
+            conn.close()
+    elif command == "restore" and len(sys.argv) > 2:
+        print(f"已恢复 {restore(parse_month(sys.argv[2]))} 行")
+    else:
+        print("用法: python retention.py run|list|archive YYYYMM|restore YYYYMM")
+        sys.exit(1)
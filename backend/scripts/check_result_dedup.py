@@ -0,0 +1,156 @@
+"""
+校验 calculate_logs 结果去重（迁移 4 与 log_writer）不改变导出内容：
+1. 在临时 SQLite 中写入去重前格式的日志（result_json 内联，含 petName 为 null、数字、超长、字段不全等情况），
+   导出 NDJSON / CSV，执行迁移 4 后再导出：按 /api/calculate 字段顺序写入的行必须逐字节相同；
+   模拟 MySQL JSON 列（存储时重排键）写入的行必须内容相同且同样被去重；可还原的行确已改记 result_hash；
+2. 经 /api/calculate 写入的新日志，导出的 result_json 必须与接口响应相同。
+不一致时打印差异并以退出码 1 结束。用法:
+    cd backend && python scripts/check_result_dedup.py
+"""
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PET_NAMES = ["", "Lucky", "小白", None, 0, 123, "x" * 200, ["a"], {"n": 1}]
+
+
+def _mysql_order(result: dict) -> dict:
+    """MySQL JSON 列存储对象时按键长、再按字节序重排键。"""
+    return dict(sorted(result.items(), key=lambda kv: (len(kv[0].encode()), kv[0].encode())))
+
+
+def _legacy_rows():
+    """去重前 /api/calculate 写入的 (pet_name 列, result_json, 是否为 MySQL 键序) 组合。"""
+    rows = []
+    for pet_name in PET_NAMES:
+        for k in range(3):
+            result = {
+                "petMonths": k,
+                "deathDate": f"2026-0{k + 1}-15",
+                "petName": pet_name,
+                "suggestedQuantity": 9,
+                "burningDates": [{"date": "2026-10-01", "desc": "数理吉日，宜祭祀"}],
+                "explanation": f"说明 {k}",
+            }
+            column = pet_name[:128] if isinstance(pet_name, str) else ""
+            rows.append((column, json.dumps(result), False))
+            rows.append((column, json.dumps(_mysql_order(result)), True))
+    # 字段不全的旧行（早期版本写入）
+    partial = {"explanation": "旧版", "petName": "Lucky", "petMonths": 1, "deathDate": "2026-01-15"}
+    rows.append(("Lucky", json.dumps(partial), False))
+    return rows
+
+
+def _export_all() -> dict:
+    import log_export
+
+    return {fmt: b"".join(log_export.export(fmt, include_result=True)) for fmt in ("ndjson", "csv")}
+
+
+def _rows(fmt: str, data: bytes) -> dict:
+    """导出内容 -> {id: 行}；行为 NDJSON 对象或 CSV 字段字典。"""
+    text = data.decode()
+    if fmt == "ndjson":
+        items = [json.loads(line) for line in text.splitlines()]
+    else:
+        items = list(csv.DictReader(io.StringIO(text)))
+        for item in items:
+            item["result_json"] = json.loads(item["result_json"]) if item["result_json"] else None
+    return {str(item["id"]): item for item in items}
+
+
+def _diff(fmt: str, before: bytes, after: bytes, by_content: set) -> bool:
+    """by_content 中的 id 只比较内容（含 result_json 的键值），其余行逐字节比较。"""
+    ok = True
+    old_rows, new_rows = _rows(fmt, before), _rows(fmt, after)
+    old_lines, new_lines = before.decode().splitlines(), after.decode().splitlines()
+    if len(old_lines) != len(new_lines) or set(old_rows) != set(new_rows):
+        print(f"[FAIL] 迁移前后 {fmt}: 行数或 id 不一致")
+        return False
+    for (row_id, old), old_line, new_line in zip(old_rows.items(), old_lines[-len(old_rows):], new_lines[-len(old_rows):]):
+        same = old == new_rows[row_id] if row_id in by_content else old_line == new_line
+        if not same:
+            print(f"[FAIL] 迁移前后 {fmt} id={row_id}\n  before: {old_line}\n  after:  {new_line}")
+            ok = False
+    return ok
+
+
+def check_migration() -> bool:
+    from db import get_connection, cursor
+    import migrations
+
+    conn = get_connection()
+    try:
+        with cursor(conn) as cur:
+            cur.execute("DELETE FROM schema_migrations WHERE version = 4")
+            legacy = _legacy_rows()
+            cur.executemany(
+                "INSERT INTO calculate_logs (user_id, pet_name, death_date, locale, result_json) VALUES (%s, %s, %s, %s, %s)",
+                [(None, name, "2026-01-15", "zh", text) for name, text, _ in legacy],
+            )
+            # 分区视图经触发器写入，lastrowid 不可靠；空库中 id 与写入顺序一一对应
+            cur.execute("SELECT id FROM calculate_logs ORDER BY id")
+            ids = [str(r["id"]) for r in cur.fetchall()]
+        conn.commit()
+        by_content = {row_id for row_id, (_, _, mysql_order) in zip(ids, legacy) if mysql_order}
+        before = _export_all()
+        migrations.migrate(conn)
+        after = _export_all()
+        with cursor(conn) as cur:
+            cur.execute("SELECT id, result_hash FROM calculate_logs")
+            hashes = {str(r["id"]): r["result_hash"] for r in cur.fetchall()}
+    finally:
+        conn.close()
+    ok = all([_diff(fmt, before[fmt], after[fmt], by_content) for fmt in before])
+    hashed = sum(1 for h in hashes.values() if h)
+    mysql_hashed = sum(1 for row_id in by_content if hashes.get(row_id))
+    # 可还原的 petName（""、"Lucky"、"小白"）各 3 行，两种键序都应去重
+    if hashed != 18 or mysql_hashed != 9:
+        print(f"[FAIL] 去重行数不符：共 {hashed} 行（应为 18），其中 MySQL 键序 {mysql_hashed} 行（应为 9）")
+        ok = False
+    print(f"迁移：{len(_legacy_rows())} 行，{hashed} 行去重，导出{'一致' if ok else '不一致'}")
+    return ok
+
+
+def check_live() -> bool:
+    from app import app
+    from log_writer import calculate_log_writer
+
+    client = app.test_client()
+    expected = []
+    for pet_name in PET_NAMES:
+        resp = client.post("/api/calculate", json={"deathDate": "2026-03-01", "petName": pet_name})
+        expected.append(resp.get_json())
+    calculate_log_writer.close()
+    exported = [json.loads(line) for line in _export_all()["ndjson"].decode().splitlines()]
+    actual = [row["result_json"] for row in exported[-len(expected):]]
+    ok = True
+    for want, got in zip(expected, actual):
+        # 接口响应按键排序序列化，这里只比较内容
+        if want != got:
+            print(f"[FAIL] 新日志\n  response: {want}\n  export:   {got}")
+            ok = False
+    print(f"新日志：{len(expected)} 条，导出{'一致' if ok else '不一致'}")
+    return ok
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["SQLITE_PATH"] = os.path.join(tmp, "check.db")
+        os.environ["METRICS_DIR"] = ""
+        from db import init_db
+
+        init_db()
+        ok = check_migration()
+        ok = check_live() and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+#!/usr/bin/env bash
+# 执行版本化数据库迁移（记录于 schema_migrations 表）。
+# MySQL 上普通索引为在线 DDL；FULLTEXT 索引（阻塞 users 写入）、calculate_logs 首次分区（复制整表，阻塞写入）
+# 与结果去重回填耗时较长，首次执行请选在低峰。多台主机同时执行时，未拿到迁移锁的一方报错退出。
+# 用法: cd /opt/pet_eternal_flame/backend && bash scripts/migrate.sh
+
+set -e
+cd "$(dirname "$0")/.."
+./venv/bin/python migrations.py
@@ -0,0 +1,18 @@
+#!/usr/bin/env bash
+# 用 COUNT(*) 校准 stat_counters 统计计数器（总用户数、总计算次数、最近 N 天每日计算次数）。
+# 建议每日低峰由 cron 执行：
+#   cd /opt/pet_eternal_flame/backend && bash scripts/reconcile-stats.sh [天数，默认 7]
+
+set -e
+cd "$(dirname "$0")/.."
+DAYS="${1:-7}"
+./venv/bin/python -c "
+from db import get_connection
+from stat_counters import reconcile
+conn = get_connection()
+try:
+    for name, value in reconcile(conn, days=int('$DAYS')).items():
+        print(f'{name} = {value}')
+finally:
+    conn.close()
+"
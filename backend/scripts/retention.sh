@@ -0,0 +1,12 @@
+#!/usr/bin/env bash
+# calculate_logs 保留期维护：预建后续月份分区，把保留期外的月分区归档为 gzip NDJSON 后整体删除。
+# 建议每日低峰由 cron 执行：
+#   cd /opt/pet_eternal_flame/backend && bash scripts/retention.sh
+# 其他子命令：
+#   bash scripts/retention.sh list              # 分区与归档概况
+#   bash scripts/retention.sh archive 202401    # 仅归档某月（不删除）
+#   bash scripts/retention.sh restore 202401    # 从归档导回某月
+
+set -e
+cd "$(dirname "$0")/.."
+./venv/bin/python retention.py "${@:-run}"
@@ -0,0 +1,134 @@
+"""
+站点设置（site_settings）的运行时读取。
+整张表读入进程内快照，由 VersionedCache 按 cache_versions 中 "site_settings" 的版本号跨 worker 失效：
+admin_upsert_setting 在同一事务内 bump 版本号，其他 worker 至多 CACHE_VERSION_POLL_INTERVAL 秒后重新加载。
+类型解析（int / float / bool / json）结果缓存在快照上，每个版本每个键只解析一次。
+"""
+import json
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import IS_PRODUCTION
+from db import get_connection, cursor
+from versioned_cache import VersionedCache, bump_version
+
+logger = logging.getLogger(__name__)
+
+SITE_SETTINGS_CACHE = "site_settings"
+
+_TRUE = {"1", "true", "yes", "on"}
+_FALSE = {"0", "false", "no", "off", ""}
+
+_MISSING = object()
+
+
+def parse_bool(value: str) -> bool:
+    text = value.strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+PARSERS: Dict[str, Callable[[str], Any]] = {
+    "str": str,
+    "int": lambda v: int(v.strip()),
+    "float": lambda v: float(v.strip()),
+    "bool": parse_bool,
+    "json": json.loads,
+}
+
+
+class SettingsSnapshot:
+    """某一版本的全部设置；typed() 的解析结果按 (key, 类型) 记住（json 值为共享对象，调用方不应修改）。"""
+
+    def __init__(self, values: Dict[str, str]):
+        self.values = values
+        self._parsed: Dict[Tuple[str, str], Any] = {}
+
+    def typed(self, key: str, kind: str) -> Any:
+        """按类型解析后的值；键不存在或无法解析时返回 _MISSING。"""
+        cache_key = (key, kind)
+        if cache_key in self._parsed:
+            return self._parsed[cache_key]
+        raw = self.values.get(key)
+        if raw is None:
+            parsed = _MISSING
+        else:
+            try:
+                parsed = PARSERS[kind](raw)
+            except (ValueError, TypeError):
+                logger.warning("site setting %r is not a valid %s: %r", key, kind, raw)
+                parsed = _MISSING
+        # 并发首次解析至多重复一次，结果相同，无需加锁
+        self._parsed[cache_key] = parsed
+        return parsed
+
+
+def _load() -> SettingsSnapshot:
+    conn = get_connection()
+    try:
+        with cursor(conn) as cur:
+            if IS_PRODUCTION:
+                cur.execute("SELECT `key`, value FROM site_settings")
+            else:
+                cur.execute('SELECT "key", value FROM site_settings')
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+    return SettingsSnapshot({r["key"]: r["value"] for r in rows})
+
+
+_settings = VersionedCache(SITE_SETTINGS_CACHE, _load)
+
+
+def get(key: str, default: Any = None, kind: str = "str") -> Any:
+    """读取设置并按 kind（str/int/float/bool/json）解析；不存在、解析失败或数据库不可用时返回 default。"""
+    if kind not in PARSERS:
+        raise ValueError(f"unknown setting type: {kind}")
+    try:
+        snapshot = _settings.get()
+    except Exception:
+        return default
+    value = snapshot.typed(key, kind)
+    return default if value is _MISSING else value
+
+
+def get_int(key: str, default: Optional[int] = None) -> Optional[int]:
+    return get(key, default, "int")
+
+
+def get_float(key: str, default: Optional[float] = None) -> Optional[float]:
+    return get(key, default, "float")
+
+
+def get_bool(key: str, default: Optional[bool] = None) -> Optional[bool]:
+    return get(key, default, "bool")
+
+
+def get_json(key: str, default: Any = None) -> Any:
+    return get(key, default, "json")
+
+
+def upsert(cur, key: str, value: str) -> None:
+    """在调用方事务中写入一条设置并递增版本号；提交后调用 changed() 使本 worker 立即失效。"""
+    if IS_PRODUCTION:
+        cur.execute(
+            "INSERT INTO site_settings (`key`, value) VALUES (%s, %s) ON DUPLICATE KEY UPDATE value = VALUES(value), updated_at = NOW()",
+            (key, value),
+        )
+    else:
+        cur.execute(
+            'INSERT INTO site_settings ("key", value) VALUES (%s, %s) ON CONFLICT("key") DO UPDATE SET value = excluded.value, updated_at = datetime(\'now\')',
+            (key, value),
+        )
+    bump_version(cur, SITE_SETTINGS_CACHE)
+
+
+def changed() -> None:
+    _settings.invalidate()
+
+
+def stats() -> dict:
+    return _settings.stats()
@@ -0,0 +1,94 @@
+"""
+运营统计计数器（stat_counters 表，name 为主键）。
+注册与 calculate_logs 写入时在同一事务内递增，/api/admin/stats 只需一次主键查询；
+reconcile() 用 COUNT(*) 重新校准，修正异常中断等造成的偏差（scripts/reconcile-stats.sh 或管理端调用）。
+"""
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from config import IS_PRODUCTION
+
+USERS_TOTAL = "users.total"
+CALCULATES_TOTAL = "calculates.total"
+# 已被保留期归档并删除的 calculate_logs 行数（retention.py 维护），累计计算次数 = 现存行数 + 已归档
+CALCULATES_ARCHIVED = "calculates.archived"
+
+
+def calculates_day(day: date) -> str:
+    return f"calculates.day.{day.isoformat()}"
+
+
+def increment(cur, name: str, delta: int = 1) -> None:
+    """在调用方事务中递增计数器（cur 为 db.cursor() 返回的游标）。"""
+    if IS_PRODUCTION:
+        cur.execute(
+            "INSERT INTO stat_counters (name, value) VALUES (%s, %s) ON DUPLICATE KEY UPDATE value = value + VALUES(value)",
+            (name, delta),
+        )
+    else:
+        cur.execute(
+            "INSERT INTO stat_counters (name, value) VALUES (%s, %s) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, delta),
+        )
+
+
+def _set(cur, name: str, value: int) -> None:
+    if IS_PRODUCTION:
+        cur.execute(
+            "INSERT INTO stat_counters (name, value) VALUES (%s, %s) ON DUPLICATE KEY UPDATE value = VALUES(value)",
+            (name, value),
+        )
+    else:
+        cur.execute(
+            "INSERT INTO stat_counters (name, value) VALUES (%s, %s) ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+            (name, value),
+        )
+
+
+def read(cur, *names: str) -> Dict[str, int]:
+    """按主键读取若干计数器，缺失的计为 0。"""
+    placeholders = ", ".join(["%s"] * len(names))
+    cur.execute(f"SELECT name, value FROM stat_counters WHERE name IN ({placeholders})", names)
+    values = {r["name"]: int(r["value"]) for r in cur.fetchall()}
+    return {n: values.get(n, 0) for n in names}
+
+
+def live_calculates(cur) -> int:
+    """calculate_logs 现存行数的近似值（不含已归档删除的部分）。"""
+    values = read(cur, CALCULATES_TOTAL, CALCULATES_ARCHIVED)
+    return max(0, values[CALCULATES_TOTAL] - values[CALCULATES_ARCHIVED])
+
+
+def reconcile(conn, days: int = 7, today: Optional[date] = None) -> Dict[str, int]:
+    """用 COUNT(*) 校准总用户数、总计算次数（含已归档）与最近 days 天的每日计算次数，返回写入的值。"""
+    from db import cursor
+
+    today = today or date.today()
+    since = today - timedelta(days=days - 1)
+    values: Dict[str, int] = {}
+    with cursor(conn) as cur:
+        cur.execute("SELECT COUNT(*) AS cnt FROM users")
+        values[USERS_TOTAL] = int(cur.fetchone()["cnt"])
+        cur.execute("SELECT COUNT(*) AS cnt FROM calculate_logs")
+        values[CALCULATES_TOTAL] = int(cur.fetchone()["cnt"]) + read(cur, CALCULATES_ARCHIVED)[CALCULATES_ARCHIVED]
+        for i in range(days):
+            values[calculates_day(since + timedelta(days=i))] = 0
+        if IS_PRODUCTION:
+            cur.execute(
+                "SELECT DATE(created_at) AS day, COUNT(*) AS cnt FROM calculate_logs WHERE created_at >= %s GROUP BY DATE(created_at)",
+                (since.isoformat(),),
+            )
+        else:
+            # SQLite 的 datetime('now') 为 UTC，按本地日期归档与计数器保持一致
+            cur.execute(
+                "SELECT date(created_at, 'localtime') AS day, COUNT(*) AS cnt FROM calculate_logs WHERE date(created_at, 'localtime') >= %s GROUP BY date(created_at, 'localtime')",
+                (since.isoformat(),),
+            )
+        for r in cur.fetchall():
+            day = r["day"] if isinstance(r["day"], date) else date.fromisoformat(str(r["day"])[:10])
+            if day >= since:
+                values[calculates_day(day)] = int(r["cnt"])
+        for name, value in values.items():
+            _set(cur, name, value)
+    conn.commit()
+    return values
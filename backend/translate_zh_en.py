@@ -1,35 +1,347 @@
 """
 中文 → 英文翻译封装，基于 deep-translator（Google Translate）。
 请求 locale=en 时用于将后端生成的中文文案译为英文；失败时回退为原文。
+
+译文带两级缓存，重复文案不再发起网络请求：
+- 进程内 LRU（TRANSLATE_CACHE_SIZE 条）
+- 数据库 translation_cache 表（按原文 sha256 + 目标语言），各 worker 与重启之间共享
+翻译失败（回退原文）的结果不写缓存，下次仍会重试。
+
+translate_zh_to_en_concurrent() 将多段文案并发提交到线程池，共用一个总时限（TRANSLATE_DEADLINE）：
+未在时限内返回的段回退为缓存译文或原文，后台调用完成后仍写入缓存；每次远程调用的耗时计入统计。
+
+/api/calculate 已改为本地渲染 backend/locales 中的模板，不再在请求中调用翻译；
+本模块作为离线工具补齐缺失的英文模板：
+    python translate_zh_en.py           # 列出 en.json 缺失的模板并预览译文
+    python translate_zh_en.py --write   # 写回 backend/locales/en.json，请人工校对后提交
 """
-from typing import List
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
+
+from config import IS_PRODUCTION, TRANSLATE_CACHE_SIZE, TRANSLATE_MAX_WORKERS, TRANSLATE_DEADLINE
+import metrics
 
 try:
     from deep_translator import GoogleTranslator
 except ImportError:
     GoogleTranslator = None
 
+SOURCE_LANG = "zh-CN"
+TARGET_LANG = "en"
 
-def translate_zh_to_en(text: str) -> str:
-    """将中文文案译为英文，失败或未安装依赖时返回原文。"""
-    if not text or not text.strip():
-        return text
+
+class _LRUCache:
+    """线程安全的定长 LRU：超过 maxsize 时淘汰最久未使用的条目。"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = max(0, maxsize)
+        self._data: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_memory = _LRUCache(TRANSLATE_CACHE_SIZE)
+_stats_lock = threading.Lock()
+_stats = {
+    "memory_hits": 0, "db_hits": 0, "misses": 0, "remote_failures": 0,
+    "remote_calls": 0, "remote_seconds_total": 0.0, "remote_seconds_max": 0.0, "deadline_misses": 0,
+}
+
+
+def _count(name: str, n: int = 1) -> None:
+    if n:
+        with _stats_lock:
+            _stats[name] += n
+
+
+def _record_latency(seconds: float) -> None:
+    metrics.observe_stage("translate", seconds)
+    with _stats_lock:
+        _stats["remote_calls"] += 1
+        _stats["remote_seconds_total"] += seconds
+        _stats["remote_seconds_max"] = max(_stats["remote_seconds_max"], seconds)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, TRANSLATE_MAX_WORKERS), thread_name_prefix="translate")
+        return _executor
+
+
+def _source_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _db_lookup(hashes: List[str]) -> Dict[str, str]:
+    """从 translation_cache 表批量读取译文，返回 {source_hash: translated}；数据库不可用时返回空。"""
+    if not hashes:
+        return {}
+    from db import get_connection, cursor
+
+    try:
+        conn = get_connection()
+    except Exception:
+        return {}
+    try:
+        placeholders = ", ".join(["%s"] * len(hashes))
+        with cursor(conn) as cur:
+            cur.execute(
+                f"SELECT source_hash, translated FROM translation_cache WHERE target_lang = %s AND source_hash IN ({placeholders})",
+                (TARGET_LANG, *hashes),
+            )
+            rows = cur.fetchall()
+        return {r["source_hash"]: r["translated"] for r in rows}
+    except Exception:
+        return {}
+    finally:
+        conn.close()
+
+
+def _db_store(entries: Dict[str, tuple]) -> None:
+    """写入 translation_cache：entries 为 {source_hash: (source_text, translated)}；已存在则忽略。"""
+    if not entries:
+        return
+    from db import get_connection, cursor
+
+    try:
+        conn = get_connection()
+    except Exception:
+        return
+    insert = "INSERT IGNORE" if IS_PRODUCTION else "INSERT OR IGNORE"
+    try:
+        with cursor(conn) as cur:
+            for h, (source, translated) in entries.items():
+                cur.execute(
+                    f"{insert} INTO translation_cache (source_hash, target_lang, source_text, translated) VALUES (%s, %s, %s, %s)",
+                    (h, TARGET_LANG, source, translated),
+                )
+        conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+    finally:
+        conn.close()
+
+
+def _remote_translate(text: str) -> Optional[str]:
+    """调用 Google Translate；失败或未安装依赖返回 None。"""
     if GoogleTranslator is None:
-        return text
+        return None
+    started = time.monotonic()
+    try:
+        return GoogleTranslator(source=SOURCE_LANG, target=TARGET_LANG).translate(text=text) or None
+    except Exception:
+        return None
+    finally:
+        _record_latency(time.monotonic() - started)
+
+
+def _remote_translate_batch(texts: List[str]) -> Optional[List[str]]:
+    if GoogleTranslator is None:
+        return None
+    started = time.monotonic()
     try:
-        return GoogleTranslator(source="zh-CN", target="en").translate(text=text) or text
+        translator = GoogleTranslator(source=SOURCE_LANG, target=TARGET_LANG)
+        out = translator.translate_batch(texts)
     except Exception:
+        return None
+    finally:
+        _record_latency(time.monotonic() - started)
+    if not out or len(out) != len(texts):
+        return None
+    return out
+
+
+def translate_zh_to_en(text: str) -> str:
+    """将中文文案译为英文，失败或未安装依赖时返回原文。"""
+    if not text or not text.strip():
         return text
+    return translate_zh_to_en_batch([text])[0]
 
 
 def translate_zh_to_en_batch(texts: List[str]) -> List[str]:
-    """批量将中文译为英文，单条失败则该条返回原文。"""
+    """批量将中文译为英文，单条失败则该条返回原文。先查内存与数据库缓存，仅未命中的文案走网络。"""
     if not texts:
         return []
-    if GoogleTranslator is None:
-        return list(texts)
-    try:
-        translator = GoogleTranslator(source="zh-CN", target="en")
-        return translator.translate_batch(texts) or list(texts)
-    except Exception:
-        return list(texts)
+    result: List[Optional[str]] = [None] * len(texts)
+    pending: Dict[str, List[int]] = {}  # source_hash -> 下标（同一批内去重）
+    for i, text in enumerate(texts):
+        if not text or not text.strip():
+            result[i] = text
+            continue
+        h = _source_hash(text)
+        cached = _memory.get(h)
+        if cached is not None:
+            _count("memory_hits")
+            result[i] = cached
+        else:
+            pending.setdefault(h, []).append(i)
+
+    if pending:
+        found = _db_lookup(list(pending))
+        _count("db_hits", len(found))
+        for h, translated in found.items():
+            _memory.set(h, translated)
+            for i in pending.pop(h):
+                result[i] = translated
+
+    if pending:
+        hashes = list(pending)
+        sources = [texts[pending[h][0]] for h in hashes]
+        _count("misses", len(hashes))
+        if len(sources) == 1:
+            single = _remote_translate(sources[0])
+            remote = [single] if single is not None else None
+        else:
+            remote = _remote_translate_batch(sources)
+        if remote is None:
+            _count("remote_failures", len(hashes))
+            remote = [None] * len(hashes)
+        to_store = {}
+        for h, source, translated in zip(hashes, sources, remote):
+            if translated:
+                _memory.set(h, translated)
+                to_store[h] = (source, translated)
+            for i in pending[h]:
+                result[i] = translated or texts[i]
+        _db_store(to_store)
+
+    return result
+
+
+def _cached_or_source(text: str) -> str:
+    """时限内未完成的文案：进程内缓存有译文则用译文，否则原文。"""
+    if not text or not text.strip():
+        return text
+    return _memory.get(_source_hash(text)) or text
+
+
+def translate_zh_to_en_concurrent(segments: List[List[str]], deadline: Optional[float] = None) -> List[List[str]]:
+    """
+    多段文案（每段一次批量翻译）并发提交，所有段共用 deadline 秒（默认 TRANSLATE_DEADLINE）的总时限。
+    超时的段逐条回退为缓存译文或原文；其远程调用在后台继续，完成后照常写入缓存，下次即可命中。
+    """
+    if not segments:
+        return []
+    timeout = TRANSLATE_DEADLINE if deadline is None else deadline
+    executor = _get_executor()
+    futures = [executor.submit(translate_zh_to_en_batch, list(texts)) for texts in segments]
+    expires = time.monotonic() + timeout
+    out = []
+    for texts, future in zip(segments, futures):
+        try:
+            out.append(future.result(timeout=max(0.0, expires - time.monotonic())))
+        except FutureTimeoutError:
+            _count("deadline_misses")
+            out.append([_cached_or_source(t) for t in texts])
+        except Exception:
+            out.append(list(texts))
+    return out
+
+
+def translation_cache_stats() -> dict:
+    """翻译缓存命中统计（当前 worker 进程）。"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["memory_size"] = len(_memory)
+    stats["memory_maxsize"] = _memory.maxsize
+    total = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+    stats["hit_ratio"] = round((stats["memory_hits"] + stats["db_hits"]) / total, 4) if total else 0.0
+    calls = stats["remote_calls"]
+    stats["remote_seconds_avg"] = round(stats["remote_seconds_total"] / calls, 4) if calls else 0.0
+    stats["remote_seconds_total"] = round(stats["remote_seconds_total"], 4)
+    stats["remote_seconds_max"] = round(stats["remote_seconds_max"], 4)
+    return stats
+
+
+_PLACEHOLDER = re.compile(r"\{\{\s*\w+\s*\}\}")
+
+
+def _mask_template(text: str) -> tuple:
+    """含 {{name}} 占位符的模板：占位符替换为 [n] 标记再翻译，返回 (遮蔽后的文本, 占位符列表)。"""
+    placeholders = _PLACEHOLDER.findall(text)
+    masked = text
+    for i, ph in enumerate(placeholders):
+        masked = masked.replace(ph, f"[{i}]", 1)
+    return masked, placeholders
+
+
+def _unmask_template(translated: str, placeholders: List[str]) -> str:
+    for i, ph in enumerate(placeholders):
+        translated = translated.replace(f"[{i}]", ph, 1)
+    return translated
+
+
+def fill_missing_templates(write: bool = False) -> dict:
+    """
+    为 en.json 补齐 zh.json 中存在而 en 缺失的 calculate 模板，返回 {key: 译文}。
+    各模板并发翻译，共用 TRANSLATE_DEADLINE 时限；超时或失败（仍为中文原文）的模板不写入，下次运行重试。
+    """
+    from messages import LOCALES_DIR, load_locale_file, raw_templates
+
+    missing = {k: v for k, v in raw_templates("zh").items() if k not in raw_templates(TARGET_LANG)}
+    masked = {k: _mask_template(v) for k, v in missing.items()}
+    translated = translate_zh_to_en_concurrent([[m] for m, _ in masked.values()])
+    filled = {}
+    for (key, (text, placeholders)), (result,) in zip(masked.items(), translated):
+        if result != text:
+            filled[key] = _unmask_template(result, placeholders)
+    if write and filled:
+        data = load_locale_file(TARGET_LANG)
+        for key, text in filled.items():
+            node = data
+            parts = key.split(".")
+            for p in parts[:-1]:
+                node = node.setdefault(p, {})
+            node[parts[-1]] = text
+        path = os.path.join(LOCALES_DIR, f"{TARGET_LANG}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    return filled
+
+
+if __name__ == "__main__":
+    result = fill_missing_templates(write="--write" in sys.argv[1:])
+    if not result:
+        print("en.json 的 calculate 模板已齐全（或本次翻译均未在时限内完成）")
+    for k, v in result.items():
+        print(f"{k}: {v}")
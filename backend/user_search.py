@@ -0,0 +1,90 @@
+"""
+管理端用户名子串搜索（n-gram 索引）。
+SQLite：FTS5 trigram 虚表 users_fts（外部内容表，rowid = users.id），注册时在同一事务内写入；
+MySQL：users.username 上的 ngram FULLTEXT 索引（ft_users_username），由 InnoDB 随 INSERT 自动维护。
+两者均由 migrations 第 2 个迁移创建并回填。结果按相关度排序：用户名完全相同的排最前，其次 bm25 / MATCH 得分，再按 id 倒序。
+搜索词短于 n-gram 长度（SQLite 3 字符、MySQL ngram_token_size 默认 2）时索引无法匹配，仍用子串 LIKE 扫描（此类搜索少见，结果与索引前一致）。
+MySQL 的 ngram 索引须在关闭 InnoDB 停用词时创建（见 migrations 第 2 个迁移），否则含停用词的 bigram（如 "ai"）不入索引。
+"""
+from typing import List, Tuple
+
+from config import IS_PRODUCTION
+
+# MySQL ngram_token_size 默认 2；SQLite trigram 分词固定为 3
+NGRAM_MIN_LENGTH = 2 if IS_PRODUCTION else 3
+
+FTS_TABLE = "users_fts"
+FULLTEXT_INDEX = "ft_users_username"
+
+_fts_ready = False
+
+
+def _fts_available(cur) -> bool:
+    """SQLite 是否已有 users_fts（旧版 SQLite 不支持 trigram 时迁移会跳过创建）。"""
+    global _fts_ready
+    if IS_PRODUCTION or _fts_ready:
+        return True
+    cur.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = %s", (FTS_TABLE,))
+    _fts_ready = cur.fetchone() is not None
+    return _fts_ready
+
+
+def _uses_index(cur, term: str) -> bool:
+    return len(term) >= NGRAM_MIN_LENGTH and _fts_available(cur)
+
+
+def _match_expr(term: str) -> str:
+    # 作为短语整体匹配（相邻 n-gram 依次出现即子串命中）；双引号在 FTS5 短语中转义为两个
+    if IS_PRODUCTION:
+        return '"' + term.replace('"', " ") + '"'
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _like_substring(term: str) -> str:
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def index_user(cur, user_id: int, username: str) -> None:
+    """注册时在调用方事务中写入搜索索引（MySQL 的 FULLTEXT 由 InnoDB 自动维护，无需操作）。"""
+    if IS_PRODUCTION or not _fts_available(cur):
+        return
+    cur.execute(f"INSERT INTO {FTS_TABLE} (rowid, username) VALUES (%s, %s)", (user_id, username))
+
+
+def where_clause(cur, term: str) -> Tuple[str, list]:
+    """users 表上的搜索条件 (SQL 片段, 参数)，供 COUNT(*) 使用。"""
+    if not _uses_index(cur, term):
+        # MySQL 的 LIKE 默认以反斜杠转义，SQLite 需显式声明
+        clause = "username LIKE %s" if IS_PRODUCTION else "username LIKE %s ESCAPE '\\'"
+        return clause, [_like_substring(term)]
+    if IS_PRODUCTION:
+        return "MATCH(username) AGAINST (%s IN BOOLEAN MODE)", [_match_expr(term)]
+    return f"id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)", [_match_expr(term)]
+
+
+def search(cur, term: str, limit: int, offset: int = 0) -> List[dict]:
+    """按相关度返回 [{id, username, created_at}]。"""
+    if not _uses_index(cur, term):
+        clause, params = where_clause(cur, term)
+        cur.execute(
+            f"SELECT id, username, created_at FROM users WHERE {clause} ORDER BY id DESC LIMIT %s OFFSET %s",
+            (*params, limit, offset),
+        )
+        return list(cur.fetchall())
+    expr = _match_expr(term)
+    if IS_PRODUCTION:
+        cur.execute(
+            "SELECT id, username, created_at FROM users "
+            "WHERE MATCH(username) AGAINST (%s IN BOOLEAN MODE) "
+            "ORDER BY username = %s DESC, MATCH(username) AGAINST (%s IN BOOLEAN MODE) DESC, id DESC "
+            "LIMIT %s OFFSET %s",
+            (expr, term, expr, limit, offset),
+        )
+    else:
+        cur.execute(
+            f"SELECT u.id, u.username, u.created_at FROM {FTS_TABLE} f JOIN users u ON u.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s "
+            "ORDER BY lower(u.username) = lower(%s) DESC, f.rank, u.id DESC LIMIT %s OFFSET %s",
+            (expr, term, limit, offset),
+        )
+    return list(cur.fetchall())
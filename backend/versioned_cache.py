@@ -0,0 +1,94 @@
+"""
+跨 worker 失效的进程内缓存。
+数据库 cache_versions 表为每类缓存保存一个递增版本号：写接口在同一事务内 bump_version()，
+各 gunicorn worker 至多每 CACHE_VERSION_POLL_INTERVAL 秒读一次版本号（主键查询），
+发现版本变化即重建；本 worker 内的写操作调用 invalidate() 立即失效。
+重建时持锁，同一 worker 内并发的未命中只触发一次加载，其余请求等待并复用结果。
+"""
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+from config import IS_PRODUCTION, CACHE_VERSION_POLL_INTERVAL
+
+T = TypeVar("T")
+
+
+def bump_version(cur, name: str) -> None:
+    """在调用方的事务中递增缓存版本号（cur 为 db.cursor() 返回的游标）。"""
+    if IS_PRODUCTION:
+        cur.execute(
+            "INSERT INTO cache_versions (name, version) VALUES (%s, 1) ON DUPLICATE KEY UPDATE version = version + 1",
+            (name,),
+        )
+    else:
+        cur.execute(
+            "INSERT INTO cache_versions (name, version) VALUES (%s, 1) ON CONFLICT(name) DO UPDATE SET version = version + 1",
+            (name,),
+        )
+
+
+def read_version(name: str) -> Optional[int]:
+    """读取缓存版本号；表不存在或数据库不可用时返回 None。"""
+    from db import get_connection, cursor
+
+    try:
+        conn = get_connection()
+    except Exception:
+        return None
+    try:
+        with cursor(conn) as cur:
+            cur.execute("SELECT version FROM cache_versions WHERE name = %s", (name,))
+            row = cur.fetchone()
+        return int(row["version"]) if row else 0
+    except Exception:
+        return None
+    finally:
+        conn.close()
+
+
+class VersionedCache(Generic[T]):
+    def __init__(self, name: str, loader: Callable[[], T], poll_interval: float = CACHE_VERSION_POLL_INTERVAL):
+        self.name = name
+        self._loader = loader
+        self.poll_interval = poll_interval
+        self._value: Optional[T] = None
+        self._version: Optional[int] = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def _fresh(self, now: float) -> bool:
+        return self._loaded and now - self._checked_at < self.poll_interval
+
+    def get(self) -> T:
+        now = time.monotonic()
+        if self._fresh(now):
+            self.hits += 1
+            return self._value
+        with self._lock:
+            now = time.monotonic()
+            if self._fresh(now):
+                # 等锁期间已由其他线程重建
+                self.hits += 1
+                return self._value
+            version = read_version(self.name)
+            if not self._loaded or version is None or version != self._version:
+                self._value = self._loader()
+                self._version = version
+                self._loaded = True
+                self.loads += 1
+            else:
+                self.hits += 1
+            self._checked_at = time.monotonic()
+            return self._value
+
+    def invalidate(self) -> None:
+        """本 worker 立即失效；其他 worker 依赖 bump_version() 后的版本轮询。"""
+        with self._lock:
+            self._loaded = False
+
+    def stats(self) -> dict:
+        return {"name": self.name, "version": self._version, "hits": self.hits, "loads": self.loads}